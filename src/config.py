@@ -38,6 +38,7 @@ class Config:
     
     # LLM configuration
     llm: Dict[str, Any] = field(default_factory=dict)
+    prompts_path: str = ""  # Empty uses config/prompts.yaml
     
     # Legacy API settings (for backward compatibility)
     claude_model: str = "claude-sonnet-4-20250514"
@@ -91,6 +92,7 @@ class Config:
         # Load LLM configuration
         if 'llm' in settings:
             self.llm = settings['llm']
+        self.prompts_path = settings.get('prompts_path', self.prompts_path)
         
         # Load legacy API settings for backward compatibility
         if 'api_limits' in settings:
@@ -1,14 +1,28 @@
 """Local file system operations for note processing."""
 
+import fnmatch
+import functools
+import os
+import re
 import shutil
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, FrozenSet, Iterator
 import logging
 
 
+# Constants
+READ_CHUNK_SIZE = 64 * 1024  # Read size once the first fstat-sized read is done
+
+
 logger = logging.getLogger(__name__)
 
 
+@functools.lru_cache(maxsize=128)
+def _compile_pattern(pattern: str) -> re.Pattern:
+    """Translate a glob pattern into a compiled regex, once per pattern."""
+    return re.compile(fnmatch.translate(os.path.normcase(pattern)))
+
+
 class FileSystemClient:
     """Client for local file system operations in Obsidian vault."""
     
@@ -51,84 +65,78 @@ class FileSystemClient:
             else:
                 target_dir = self.vault_path
             
-            files = []
-            
-            if recursive:
-                # Recursive search with pattern matching
-                for pattern in (file_patterns or ['*']):
-                    for file_path in target_dir.rglob(pattern):
-                        if file_path.is_file() and self._should_include_file(file_path, target_dir, exclude_folders):
-                            stat = file_path.stat()
-                            relative_path = file_path.relative_to(target_dir)
-                            files.append({
-                                'path': str(file_path),
-                                'name': file_path.name,
-                                'relative_path': str(relative_path),
-                                'subfolder': str(relative_path.parent) if relative_path.parent != Path('.') else '',
-                                'size': stat.st_size,
-                                'modified_time': stat.st_mtime
-                            })
-            else:
-                # Non-recursive search (original behavior)
-                for file_path in target_dir.iterdir():
-                    if file_path.is_file():
-                        # Match against patterns if provided
-                        if file_patterns and not any(file_path.match(pattern) for pattern in file_patterns):
-                            continue
-                            
-                        stat = file_path.stat()
-                        files.append({
-                            'path': str(file_path),
-                            'name': file_path.name,
-                            'relative_path': file_path.name,
-                            'subfolder': '',
-                            'size': stat.st_size,
-                            'modified_time': stat.st_mtime
-                        })
-            
-            # Remove duplicates (in case patterns overlap)
-            seen_paths = set()
-            unique_files = []
-            for file_info in files:
-                if file_info['path'] not in seen_paths:
-                    seen_paths.add(file_info['path'])
-                    unique_files.append(file_info)
+            files = list(self._scan_directory(
+                directory=str(target_dir),
+                relative_dir="",
+                recursive=recursive,
+                file_patterns=[_compile_pattern(pattern) for pattern in (file_patterns or ['*'])],
+                exclude_folders=frozenset(exclude_folders or ())
+            ))
             
             # Sort by modification time (newest first)
-            unique_files.sort(key=lambda x: x['modified_time'], reverse=True)
+            files.sort(key=lambda x: x['modified_time'], reverse=True)
             
-            logger.info(f"Found {len(unique_files)} files in {target_dir} (recursive={recursive})")
-            return unique_files
+            logger.info(f"Found {len(files)} files in {target_dir} (recursive={recursive})")
+            return files
             
         except Exception as e:
             logger.error(f"Error listing files in {folder_name}: {e}")
             return []
     
-    def _should_include_file(self, file_path: Path, base_dir: Path, exclude_folders: List[str]) -> bool:
+    def _scan_directory(self, directory: str, relative_dir: str, recursive: bool,
+                        file_patterns: List[re.Pattern], exclude_folders: FrozenSet[str]) -> Iterator[Dict[str, Any]]:
         """
-        Check if a file should be included based on exclude folder rules.
+        Yield metadata for matching files in a directory using os.scandir.
+        
+        DirEntry caches the file type from the directory listing and its
+        stat result, so each file costs at most one stat call.
         
         Args:
-            file_path: Path to the file
-            base_dir: Base directory for relative path calculation
-            exclude_folders: List of folder names to exclude
+            directory: Absolute path of the directory to scan
+            relative_dir: Path of the directory relative to the listing root
+            recursive: Whether to descend into subdirectories
+            file_patterns: Compiled glob patterns matched against file names
+            exclude_folders: Folder names that are never descended into
             
-        Returns:
-            True if file should be included, False otherwise
+        Yields:
+            File metadata dictionaries
         """
-        if not exclude_folders:
-            return True
-            
-        # Check if any parent folder is in the exclude list
+        # Like Path.rglob, skip folders that can't be listed rather than
+        # failing the whole listing; recursive calls handle their own folder
         try:
-            relative_path = file_path.relative_to(base_dir)
-            for part in relative_path.parts[:-1]:  # Exclude the filename itself
-                if part in exclude_folders:
-                    return False
-            return True
-        except ValueError:
-            # File is not under base_dir
-            return False
+            entries = os.scandir(directory)
+        except OSError as e:
+            logger.warning(f"Skipping unreadable folder {directory}: {e}")
+            return
+        
+        with entries:
+            for entry in entries:
+                # Don't follow symlinked folders, matching Path.rglob
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive and entry.name not in exclude_folders:
+                        yield from self._scan_directory(
+                            directory=entry.path,
+                            relative_dir=os.path.join(relative_dir, entry.name),
+                            recursive=recursive,
+                            file_patterns=file_patterns,
+                            exclude_folders=exclude_folders
+                        )
+                elif entry.is_file() and self._matches_any(entry.name, file_patterns):
+                    stat = entry.stat()
+                    yield {
+                        'path': entry.path,
+                        'name': entry.name,
+                        'relative_path': os.path.join(relative_dir, entry.name),
+                        'subfolder': relative_dir,
+                        'size': stat.st_size,
+                        'modified_time': stat.st_mtime
+                    }
+    
+    @staticmethod
+    def _matches_any(file_name: str, file_patterns: List[re.Pattern]) -> bool:
+        """Check a file name against compiled glob patterns (case rules follow the OS)."""
+        normalized_name = os.path.normcase(file_name)
+        return any(pattern.match(normalized_name) for pattern in file_patterns)
     
     def read_file(self, file_path: str) -> bytes:
         """
@@ -141,14 +149,36 @@ class FileSystemClient:
             File content as bytes
         """
         try:
-            path = Path(file_path)
-            content = path.read_bytes()
+            content = self._read_fd(file_path)
             logger.debug(f"Read {len(content)} bytes from {file_path}")
             return content
         except Exception as e:
             logger.error(f"Error reading file {file_path}: {e}")
             raise
     
+    @staticmethod
+    def _read_fd(file_path: str) -> bytes:
+        """
+        Read a whole file through a raw descriptor.
+        
+        The first read is sized from fstat on the open descriptor, which
+        skips the extra stat and tty probe that buffered open() performs.
+        """
+        fd = os.open(file_path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+        try:
+            # One byte past the size so a single read usually reaches EOF
+            read_size = os.fstat(fd).st_size + 1
+            chunks = []
+            while True:
+                chunk = os.read(fd, read_size)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+                read_size = READ_CHUNK_SIZE
+            return b"".join(chunks)
+        finally:
+            os.close(fd)
+    
     def rename_file(self, file_path: str, new_name: str):
         """
         Rename a file in the file system.
@@ -238,10 +268,13 @@ class FileSystemClient:
             List of folder names
         """
         try:
-            folders = []
-            for item in self.vault_path.iterdir():
-                if item.is_dir() and not item.name.startswith('.'):
-                    folders.append(item.name)
+            # DirEntry.is_dir() answers from the directory listing, so only
+            # symlinks need an extra stat
+            with os.scandir(self.vault_path) as entries:
+                folders = [
+                    entry.name for entry in entries
+                    if not entry.name.startswith('.') and entry.is_dir()
+                ]
             
             folders.sort()
             return folders
@@ -3,20 +3,29 @@
 import logging
 from typing import Dict, Any, Optional
 
-try:
-    from ..claude_client import ClaudeClient
-except ImportError:
-    # Fallback for direct imports
-    import sys
-    from pathlib import Path
-    src_path = Path(__file__).parent.parent
-    sys.path.insert(0, str(src_path))
-    from claude_client import ClaudeClient
 from .base_client import BaseLLMClient
 
 
 logger = logging.getLogger(__name__)
 
+# Bound on first wrapper construction so importing this module (e.g. via the
+# factory) doesn't pull in the Anthropic SDK; tests may patch it beforehand
+ClaudeClient = None
+
+
+def _load_claude_client():
+    """Import the ClaudeClient class on first use."""
+    try:
+        from ..claude_client import ClaudeClient as client_class
+    except ImportError:
+        # Fallback for direct imports
+        import sys
+        from pathlib import Path
+        src_path = Path(__file__).parent.parent
+        sys.path.insert(0, str(src_path))
+        from claude_client import ClaudeClient as client_class
+    return client_class
+
 
 class ClaudeClientWrapper(BaseLLMClient):
     """Wrapper for the existing ClaudeClient to fit the LLM abstraction."""
@@ -30,6 +39,10 @@ class ClaudeClientWrapper(BaseLLMClient):
         """
         super().__init__(config)
         
+        global ClaudeClient
+        if ClaudeClient is None:
+            ClaudeClient = _load_claude_client()
+        
         # Create the original Claude client
         self.claude_client = ClaudeClient(config)
         
@@ -20,11 +20,17 @@ class ProcessingResult(Enum):
 
 try:
     from .prompt_manager import PromptManager
-    from .utils import calculate_file_hash, parse_frontmatter, generate_frontmatter
+    from .utils import (
+        calculate_file_hash, parse_frontmatter, generate_frontmatter_bytes,
+        split_frontmatter, scan_frontmatter_scalars, is_simple_frontmatter
+    )
 except ImportError:
     # Fallback for direct imports in tests
     from prompt_manager import PromptManager
-    from utils import calculate_file_hash, parse_frontmatter, generate_frontmatter
+    from utils import (
+        calculate_file_hash, parse_frontmatter, generate_frontmatter_bytes,
+        split_frontmatter, scan_frontmatter_scalars, is_simple_frontmatter
+    )
 
 
 
@@ -34,6 +40,13 @@ logger = logging.getLogger(__name__)
 class Note:
     """Represents a note being processed through the pipeline."""
     
+    # No per-instance __dict__; a run may hold many notes
+    __slots__ = (
+        'file_path', 'name', 'content', 'relative_path', 'text_content',
+        'content_without_frontmatter', 'original_content_without_frontmatter',
+        'existing_frontmatter', 'enhanced_content', 'metadata', '_frontmatter_parsed'
+    )
+    
     def __init__(self, file_path: str, name: str, content: bytes, relative_path: str = ""):
         """
         Initialize a Note object.
@@ -54,6 +67,7 @@ class Note:
         self.existing_frontmatter: Dict[str, Any] = {}
         self.enhanced_content: str = ""
         self.metadata: Dict[str, Any] = {}
+        self._frontmatter_parsed: bool = False  # Set once content has been decoded and split
 
 
 class NotePipeline:
@@ -122,16 +136,28 @@ class NotePipeline:
             return False
         
         try:
-            # Decode content for text processing
-            note.text_content = note.content.decode('utf-8')
+            # Decode and parse only once per note; repeat calls reuse the result
+            if not note._frontmatter_parsed:
+                # Decode content for text processing
+                note.text_content = note.content.decode('utf-8')
+                
+                # Previously processed, unchanged notes are the common case and
+                # only need their note_hash compared, not a full YAML parse
+                if self._hash_unchanged(note.text_content):
+                    logger.info(f"Note unchanged (hash match): {note.name}")
+                    return False
+                
+                # Parse existing frontmatter if any
+                content_without_fm, frontmatter = parse_frontmatter(note.text_content)
+                note.existing_frontmatter = frontmatter
+                # Store content without frontmatter for processing
+                note.content_without_frontmatter = content_without_fm
+                # Store original content for preservation at the end of processed note
+                note.original_content_without_frontmatter = content_without_fm
+                note._frontmatter_parsed = True
             
-            # Parse existing frontmatter if any
-            content_without_fm, frontmatter = parse_frontmatter(note.text_content)
-            note.existing_frontmatter = frontmatter
-            # Store content without frontmatter for processing
-            note.content_without_frontmatter = content_without_fm
-            # Store original content for preservation at the end of processed note
-            note.original_content_without_frontmatter = content_without_fm
+            frontmatter = note.existing_frontmatter
+            content_without_fm = note.original_content_without_frontmatter
             
             # Check if note should be ignored (ignoreParse: true)
             ignore_parse = frontmatter.get('ignoreParse', False)
@@ -153,6 +179,24 @@ class NotePipeline:
             logger.error(f"Failed to decode text file as UTF-8: {note.name}")
             return False
     
+    def _hash_unchanged(self, text_content: str) -> bool:
+        """
+        Check note_hash against the body without parsing the YAML.
+        
+        Only a definite match returns True. Anything else, including notes that
+        set ignoreParse or whose frontmatter isn't simple enough to be sure it
+        parses, is left to the full frontmatter parse in _filter.
+        """
+        frontmatter_text, content_without_fm = split_frontmatter(text_content)
+        if frontmatter_text is None or not is_simple_frontmatter(frontmatter_text):
+            return False
+        
+        scalars = scan_frontmatter_scalars(frontmatter_text)
+        if 'note_hash' not in scalars or 'ignoreParse' in scalars:
+            return False
+        
+        return scalars['note_hash'] == calculate_file_hash(content_without_fm)
+    
     def _validate(self, note: Note) -> bool:
         """Check file size and format limits."""
         max_size = self.config.max_note_size_kb * BYTES_PER_KB
@@ -240,9 +284,8 @@ class NotePipeline:
         content_hash = calculate_file_hash(combined_content)
         note.metadata['note_hash'] = content_hash
         
-        # Generate final content with frontmatter
-        final_content = generate_frontmatter(note.metadata)
-        final_content += combined_content
+        # Generate final content with frontmatter, encoding each part once
+        final_content = generate_frontmatter_bytes(note.metadata) + combined_content.encode('utf-8')
         
         # Remove underscore from name
         final_name = note.name[1:] if note.name.startswith('_') else note.name
@@ -253,5 +296,5 @@ class NotePipeline:
         self.file_client.update_file(
             file_path=note.file_path,
             new_name=final_name,
-            content=final_content.encode('utf-8')
+            content=final_content
         )
\ No newline at end of file
@@ -3,45 +3,39 @@
 import json
 import yaml
 from pathlib import Path
-from typing import Dict, Any
+from types import MappingProxyType
+from typing import Dict, Any, Mapping, Optional, Tuple
 import logging
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+    ORJSON_AVAILABLE = True
+except ImportError:
+    # Responses are always str, so call one shared decoder directly
+    _json_loads = json.JSONDecoder().decode
+    ORJSON_AVAILABLE = False
 
-logger = logging.getLogger(__name__)
 
+# Constants
+DEFAULT_PROMPTS_PATH = Path(__file__).parent.parent / 'config' / 'prompts.yaml'
+NOTE_CONTENT_FIELD = '{note_content}'  # Replacement field the user template is split on
+REQUIRED_RESPONSE_KEYS = frozenset({'content', 'metadata'})
+YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)  # libyaml when PyYAML was built with it
 
-class PromptManager:
-    """Manages prompts and response parsing for Claude interactions."""
-    
-    def __init__(self, config):
-        """
-        Initialize the prompt manager.
-        
-        Args:
-            config: Configuration object containing settings
-        """
-        self.config = config
-        self.prompts = self._load_prompts()
-    
-    def _load_prompts(self) -> Dict[str, str]:
-        """Load prompts from YAML configuration."""
-        prompts_path = Path(__file__).parent.parent / 'config' / 'prompts.yaml'
-        
-        if prompts_path.exists():
-            with open(prompts_path, 'r') as f:
-                prompt_config = yaml.safe_load(f)
-                return prompt_config.get('prompts', {})
-        else:
-            # Default prompts if config doesn't exist
-            return {
-                'system': """You are an AI assistant helping to organize and enhance notes.
+
+logger = logging.getLogger(__name__)
+
+# Prompts used when config/prompts.yaml is missing; read-only so it can be shared
+_DEFAULT_PROMPTS: Mapping[str, str] = MappingProxyType({
+    'system': """You are an AI assistant helping to organize and enhance notes.
 Your task is to clean up raw notes, add relevant hashtags, and create summaries.
 
 Always respond with a JSON object containing:
 - content: The enhanced note content
 - metadata: Object with summary and tags""",
-                
-                'user': """Please process this note:
+    
+    'user': """Please process this note:
 1. Clean up formatting and grammar
 2. Convert to clear bullet points where appropriate
 3. Generate 3-5 relevant hashtags
@@ -58,7 +52,102 @@ Respond with JSON in this format:
     "tags": ["#tag1", "#tag2"]
   }}
 }}"""
-            }
+})
+
+# Metadata returned when a response can't be parsed; copied per call
+_FALLBACK_METADATA: Dict[str, Any] = {
+    'summary': 'Failed to parse AI response',
+    'tags': ['#processing-error']
+}
+
+# Parsed prompts keyed by path, stored with the (mtime_ns, size) they were
+# read at; an edited file replaces its entry rather than adding one
+_PROMPT_CACHE: Dict[str, Tuple[int, int, Dict[str, str]]] = {}
+
+
+class PromptManager:
+    """Manages prompts and response parsing for Claude interactions."""
+    
+    def __init__(self, config):
+        """
+        Initialize the prompt manager.
+        
+        Args:
+            config: Configuration object containing settings
+        """
+        self._init_from(config, self._load_prompts(config))
+    
+    def _init_from(self, config, prompts: Dict[str, str]):
+        """Set up every instance attribute; shared by __init__ and from_mapping."""
+        self.config = config
+        self.prompts = prompts
+        self._user_parts = self._split_user_template(prompts.get('user', ''))
+    
+    @staticmethod
+    def _load_prompts(config) -> Dict[str, str]:
+        """Load prompts from YAML configuration."""
+        # config.prompts_path overrides the bundled config/prompts.yaml
+        configured_path = getattr(config, 'prompts_path', '')
+        prompts_path = Path(configured_path) if configured_path else DEFAULT_PROMPTS_PATH
+        
+        if prompts_path.exists():
+            stat = prompts_path.stat()
+            cache_key = str(prompts_path)
+            cached = _PROMPT_CACHE.get(cache_key)
+            if cached is None or cached[:2] != (stat.st_mtime_ns, stat.st_size):
+                # libyaml decodes the raw bytes itself (UTF-8 or a BOM-marked UTF-16)
+                with open(prompts_path, 'rb') as f:
+                    prompt_config = yaml.load(f, Loader=YAML_LOADER)
+                cached = (stat.st_mtime_ns, stat.st_size, prompt_config.get('prompts', {}))
+                _PROMPT_CACHE[cache_key] = cached
+            # Copy so one manager's changes never leak into another's
+            return dict(cached[2])
+        else:
+            # Default prompts if config doesn't exist, copied like loaded ones
+            return dict(_DEFAULT_PROMPTS)
+    
+    @classmethod
+    def from_mapping(cls, config, prompt_config: Dict[str, Any]) -> 'PromptManager':
+        """
+        Build a prompt manager from an already-parsed prompts mapping.
+        
+        Args:
+            config: Configuration object containing settings
+            prompt_config: Mapping shaped like prompts.yaml, with a 'prompts' key
+            
+        Returns:
+            PromptManager that never touches the prompts file
+        """
+        manager = cls.__new__(cls)
+        manager._init_from(config, dict(prompt_config.get('prompts', {})))
+        return manager
+    
+    @staticmethod
+    def _split_user_template(template: str) -> Optional[Tuple[str, str]]:
+        """
+        Split the user template around its {note_content} field, once per load.
+        
+        Args:
+            template: User prompt template in str.format syntax
+            
+        Returns:
+            Unescaped (prefix, suffix) pair, or None when the template needs
+            a full .format call (no field, repeated field or other fields)
+        """
+        prefix, field, suffix = template.partition(NOTE_CONTENT_FIELD)
+        if not field or NOTE_CONTENT_FIELD in suffix:
+            return None
+        try:
+            # Formatting with no arguments turns {{ }} into braces and rejects
+            # any other replacement field
+            return prefix.format(), suffix.format()
+        except (KeyError, IndexError, ValueError):
+            return None
+    
+    @staticmethod
+    def clear_cache():
+        """Forget prompts parsed by earlier instances so the next load reads the file."""
+        _PROMPT_CACHE.clear()
     
     def format_note_prompt(self, note_content: str) -> Dict[str, str]:
         """
@@ -70,7 +159,11 @@ Respond with JSON in this format:
         Returns:
             Dict with system and user prompts
         """
-        user_prompt = self.prompts['user'].format(note_content=note_content)
+        if self._user_parts is not None:
+            prefix, suffix = self._user_parts
+            user_prompt = prefix + note_content + suffix
+        else:
+            user_prompt = self.prompts['user'].format(note_content=note_content)
         
         return {
             'system': self.prompts['system'],
@@ -101,8 +194,15 @@ Respond with JSON in this format:
                 if lines[0].strip() == '```' and lines[-1].strip() == '```':
                     response_clean = '\n'.join(lines[1:-1])
             
+            # Only a JSON object can pass validation; skip the parser for
+            # prose replies and other values
+            if response_clean.lstrip()[:1] != '{':
+                raise ValueError("Response is not a JSON object")
+            
             # Try to parse as JSON
-            parsed = json.loads(response_clean)
+            # orjson.JSONDecodeError subclasses json.JSONDecodeError, so the
+            # handler below covers both parsers
+            parsed = _json_loads(response_clean)
             logger.debug(f"Parsed JSON structure: {parsed}")
             logger.debug(f"Parsed JSON type: {type(parsed)}")
             logger.debug(f"Parsed JSON keys: {parsed.keys() if isinstance(parsed, dict) else 'Not a dict'}")
@@ -111,11 +211,9 @@ Respond with JSON in this format:
             if not isinstance(parsed, dict):
                 raise ValueError(f"Response is not a dictionary, got {type(parsed)}")
             
-            if 'content' not in parsed:
-                raise ValueError(f"Response missing 'content' field. Available keys: {list(parsed.keys())}")
-            
-            if 'metadata' not in parsed:
-                raise ValueError(f"Response missing 'metadata' field. Available keys: {list(parsed.keys())}")
+            if not parsed.keys() >= REQUIRED_RESPONSE_KEYS:
+                missing = sorted(REQUIRED_RESPONSE_KEYS - parsed.keys())
+                raise ValueError(f"Response missing {missing} field(s). Available keys: {list(parsed.keys())}")
             
             # Pass through metadata as-is, trusting Claude's response
             metadata = parsed['metadata'].copy()
@@ -123,8 +221,9 @@ Respond with JSON in this format:
             
             # Only ensure tags are properly formatted if they exist
             if 'tags' in metadata and isinstance(metadata['tags'], list):
+                # Slice compare skips a startswith method lookup per tag
                 metadata['tags'] = [
-                    tag if tag.startswith('#') else f'#{tag}'
+                    tag if tag[:1] == '#' else f'#{tag}'
                     for tag in metadata['tags']
                 ]
             
@@ -149,8 +248,6 @@ Respond with JSON in this format:
             # Fallback: return original content with minimal metadata
             return {
                 'content': response,
-                'metadata': {
-                    'summary': 'Failed to parse AI response',
-                    'tags': ['#processing-error']
-                }
+                # Copies, tags list included, so callers can edit their metadata
+                'metadata': dict(_FALLBACK_METADATA, tags=list(_FALLBACK_METADATA['tags']))
             }
\ No newline at end of file
@@ -1,53 +1,203 @@
 """Utility functions for the note assistant."""
 
 import hashlib
-import yaml
-from typing import Tuple, Dict, Any
+import os
+import re
+from typing import AnyStr, Tuple, Dict, Any, Iterable, List, Optional, Union
 
 # Constants
 FRONTMATTER_DELIMITER_OFFSET = 4  # Length of "---\n"
 FRONTMATTER_CLOSING_LENGTH = 5    # Length of "\n---\n"
+FRONTMATTER_MIN_LENGTH = FRONTMATTER_DELIMITER_OFFSET + FRONTMATTER_CLOSING_LENGTH
+FRONTMATTER_MAX_LENGTH = 16384    # Longest frontmatter block searched for a closing ---
+FILE_HASH_PREFIX = "sha256:"      # Algorithm tag stored in note_hash
+HASH_READ_CHUNK_SIZE = 64 * 1024  # Buffer reused by calculate_file_hash_path
 
+# Top-level frontmatter keys the pipeline's filter can read without a YAML parse
+FRONTMATTER_SCALAR_PATTERN = re.compile(r'^(note_hash|ignoreParse):[ \t]*(.*?)[ \t]*$', re.MULTILINE)
 
-def calculate_file_hash(content: str) -> str:
+# Frontmatter blocks made only of top-level "key: scalar" lines and
+# unindented "- scalar" items, which always load as a mapping whose scalars
+# read the same as the raw scan. Plain scalars start with a letter or are
+# simple decimals, so no resolver (dates, say) can fail on them; anything
+# else needs the full parse.
+_YAML_PRINTABLE_NON_ASCII = r'\xa0-\u2027\u202a-\ud7ff\ue000-\ufefe\uff00-\ufffd\U00010000-\U0010ffff'
+_YAML_PLAIN = rf'[A-Za-z](?:[\x20-\x22\x24-\x39\x3b-\x7e{_YAML_PRINTABLE_NON_ASCII}]|:(?=[^ \n])|(?<! )#)*'
+_YAML_SINGLE_QUOTED = rf"'(?:[\x20-\x26\x28-\x7e{_YAML_PRINTABLE_NON_ASCII}]|'')*'"
+_YAML_DOUBLE_QUOTED = (
+    rf'"(?:[\x20\x21\x23-\x5b\x5d-\x7e{_YAML_PRINTABLE_NON_ASCII}]'
+    r'|\\(?:[0abtnvfre "/\\N_LP]|x[0-9A-Fa-f]{2}|u[0-9A-Fa-f]{4}))*"'
+)
+_YAML_NUMBER = r'-?[0-9]+(?:\.[0-9]+)?'
+_YAML_SCALAR = f'(?:{_YAML_PLAIN}|{_YAML_NUMBER}|{_YAML_SINGLE_QUOTED}|{_YAML_DOUBLE_QUOTED})'
+FRONTMATTER_SIMPLE_BLOCK_PATTERN = re.compile(
+    rf'(?:[A-Za-z_][A-Za-z0-9_-]*:(?: (?:{_YAML_SCALAR}|\[\]|\{{\}}) *\n| *\n(?:- {_YAML_SCALAR} *\n)*))+'
+)
+
+# System fields in the exact shapes the pipeline writes; these are emitted
+# without PyYAML, as the plain scalars PyYAML would produce for them
+FRONTMATTER_PLAIN_FIELDS = {
+    'processed_datetime': re.compile(r'[A-Z][a-z]{2} \d{2}, \d{4} \d{2}:\d{2}:\d{2} UTC'),
+    'note_hash': re.compile(re.escape(FILE_HASH_PREFIX) + r'[0-9a-f]{64}'),
+}
+# Simple ASCII hashtags, which PyYAML single-quotes because of the leading #
+FRONTMATTER_TAG_PATTERN = re.compile(r'#[A-Za-z0-9_/-]+')
+# A run of simple hashtags already joined into block sequence items, so a
+# whole tag list is checked with one match instead of one per tag
+FRONTMATTER_TAG_SEPARATOR = "'\n- '"
+FRONTMATTER_TAG_LIST_PATTERN = re.compile(
+    f"{FRONTMATTER_TAG_PATTERN.pattern}(?:{re.escape(FRONTMATTER_TAG_SEPARATOR)}{FRONTMATTER_TAG_PATTERN.pattern})*"
+)
+# Scalars that PyYAML writes plain, on one line, with no resolver reading
+# them back as anything but a string
+FRONTMATTER_PLAIN_KEY_PATTERN = re.compile(r'[A-Za-z_][A-Za-z0-9_]*')
+FRONTMATTER_PLAIN_STRING_PATTERN = re.compile(r"[A-Za-z](?:[A-Za-z0-9 .,_/()'!-]*[A-Za-z0-9.,_/()'!-])?")
+FRONTMATTER_RESERVED_WORDS = frozenset(
+    'yes Yes YES no No NO true True TRUE false False FALSE on On ON off Off OFF null Null NULL'.split()
+)
+FRONTMATTER_LINE_WIDTH = 80  # PyYAML folds plain scalars past this column
+
+# Emitter settings for frontmatter, configured once for every dump
+FRONTMATTER_DUMP_OPTIONS = {
+    'default_flow_style': False,
+    'allow_unicode': True,
+    'sort_keys': False,
+}
+# Pure-ASCII metadata skips PyYAML's unicode-aware scalar handling
+FRONTMATTER_ASCII_DUMP_OPTIONS = {**FRONTMATTER_DUMP_OPTIONS, 'allow_unicode': False}
+# What PyYAML emits for empty metadata, returned as-is without dumping
+EMPTY_FRONTMATTER = "---\n{}\n---\n"
+EMPTY_FRONTMATTER_BYTES = EMPTY_FRONTMATTER.encode('utf-8')
+
+
+def calculate_file_hash(content: Union[str, bytes]) -> str:
     """
     Calculate SHA-256 hash of content.
     
     Args:
-        content: Text content to hash
+        content: Text content to hash, or its UTF-8 bytes (any bytes-like
+            object) to skip the encode
         
     Returns:
         str: SHA-256 hash in format "sha256:hexdigest"
     """
-    hash_obj = hashlib.sha256(content.encode('utf-8'))
-    return f"sha256:{hash_obj.hexdigest()}"
+    data = content.encode('utf-8') if isinstance(content, str) else content
+    hash_obj = hashlib.sha256(data)
+    return f"{FILE_HASH_PREFIX}{hash_obj.hexdigest()}"
+
+
+def calculate_file_hashes(contents: Iterable[Union[str, bytes]]) -> List[str]:
+    """
+    Calculate SHA-256 hashes of many notes across threads.
+    
+    hashlib releases the GIL while digesting inputs over 2 KB, so threads
+    hash in parallel; inputs of 16 KB or more amortize the handoff best.
+    
+    Args:
+        contents: Texts or UTF-8 bytes to hash
+        
+    Returns:
+        List of hashes in format "sha256:hexdigest", in input order
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        return list(executor.map(calculate_file_hash, contents))
+
+
+def calculate_file_hash_path(file_path: str) -> str:
+    """
+    Calculate SHA-256 hash of a file's bytes without loading it whole.
+    
+    The file is read unbuffered into one reused buffer, so memory use stays
+    constant however large the file is.
+    
+    Args:
+        file_path: Path to the file to hash
+        
+    Returns:
+        str: SHA-256 hash in format "sha256:hexdigest", equal to
+            calculate_file_hash of the file's content
+    """
+    hash_obj = hashlib.sha256()
+    buffer = bytearray(HASH_READ_CHUNK_SIZE)
+    view = memoryview(buffer)
+    with open(file_path, 'rb', buffering=0) as f:
+        while True:
+            read_size = f.readinto(view)
+            if not read_size:
+                break
+            hash_obj.update(view[:read_size])
+    return f"{FILE_HASH_PREFIX}{hash_obj.hexdigest()}"
 
 
-def parse_frontmatter(content: str) -> Tuple[str, Dict[str, Any]]:
+def split_frontmatter(content: AnyStr) -> Tuple[Optional[AnyStr], AnyStr]:
+    """
+    Split the raw frontmatter block from content without parsing it.
+    
+    Args:
+        content: Full content including potential frontmatter, as text or
+            UTF-8 bytes (the search window is then counted in bytes)
+        
+    Returns:
+        Tuple of (frontmatter_text, content_without_frontmatter), of the same
+        type as content; frontmatter_text is None when the content has no
+        frontmatter block
+    """
+    if isinstance(content, str):
+        opening, closing = '---\n', '\n---\n'
+    else:
+        opening, closing = b'---\n', b'\n---\n'
+    
+    # Too short to hold both delimiters, or no opening delimiter
+    if len(content) < FRONTMATTER_MIN_LENGTH or not content.startswith(opening):
+        return None, content
+    
+    # Find the closing --- within a bounded window so large notes
+    # without frontmatter aren't scanned end to end
+    end_index = content.find(
+        closing,
+        FRONTMATTER_DELIMITER_OFFSET,
+        FRONTMATTER_DELIMITER_OFFSET + FRONTMATTER_MAX_LENGTH + FRONTMATTER_CLOSING_LENGTH
+    )
+    if end_index == -1:
+        return None, content
+    
+    frontmatter_text = content[FRONTMATTER_DELIMITER_OFFSET:end_index]
+    content_without_fm = content[end_index + FRONTMATTER_CLOSING_LENGTH:]  # Skip past \n---\n
+    return frontmatter_text, content_without_fm
+
+
+def parse_frontmatter(content: AnyStr) -> Tuple[AnyStr, Dict[str, Any]]:
     """
     Parse YAML frontmatter from content.
     
+    Bytes are split and handed to the YAML loader as-is, which reads UTF-8
+    directly instead of decoding the whole note first.
+    
     Args:
-        content: Full content including potential frontmatter
+        content: Full content including potential frontmatter, as text or UTF-8 bytes
         
     Returns:
-        Tuple of (content_without_frontmatter, frontmatter_dict)
+        Tuple of (content_without_frontmatter, frontmatter_dict); the content
+        has the same type as the input
     """
-    if not content.startswith('---\n'):
+    frontmatter_text, content_without_fm = split_frontmatter(content)
+    if frontmatter_text is None:
         return content, {}
     
+    # PyYAML is imported lazily so hashing-only callers don't pay for it
+    import yaml
+    
     try:
-        # Find the closing ---
-        end_index = content.find('\n---\n', FRONTMATTER_DELIMITER_OFFSET)
-        if end_index == -1:
-            return content, {}
-        
-        # Extract frontmatter
-        frontmatter_text = content[FRONTMATTER_DELIMITER_OFFSET:end_index]
-        content_without_fm = content[end_index + FRONTMATTER_CLOSING_LENGTH:]  # Skip past \n---\n
+        # Parse YAML, in C when PyYAML was built with libyaml
+        loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+        frontmatter = yaml.load(frontmatter_text, Loader=loader) or {}
         
-        # Parse YAML
-        frontmatter = yaml.safe_load(frontmatter_text) or {}
+        # A block that isn't a mapping (a list, a bare line of text) isn't
+        # frontmatter; keep it in the content like unparseable YAML
+        if not isinstance(frontmatter, dict):
+            return content, {}
         
         return content_without_fm, frontmatter
         
@@ -56,6 +206,46 @@ def parse_frontmatter(content: str) -> Tuple[str, Dict[str, Any]]:
         return content, {}
 
 
+def scan_frontmatter_scalars(frontmatter_text: str) -> Dict[str, str]:
+    """
+    Read the raw note_hash and ignoreParse values from frontmatter text.
+    
+    Values are returned as written, minus one pair of matching surrounding
+    quotes; no YAML typing is applied. Callers needing exact YAML semantics
+    must fall back to parse_frontmatter.
+    
+    Args:
+        frontmatter_text: Frontmatter block without its --- delimiters
+        
+    Returns:
+        Dict of the keys found; a repeated key keeps its last value, as in YAML
+    """
+    scalars = {}
+    for match in FRONTMATTER_SCALAR_PATTERN.finditer(frontmatter_text):
+        value = match.group(2)
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in '"\'':
+            value = value[1:-1]
+        scalars[match.group(1)] = value
+    return scalars
+
+
+def is_simple_frontmatter(frontmatter_text: str) -> bool:
+    """
+    Check whether a frontmatter block is plain enough to trust the raw scan.
+    
+    A simple block always YAML-parses to a mapping, and its note_hash and
+    ignoreParse values are what scan_frontmatter_scalars reads. Blocks that
+    aren't simple may still be valid; they just need parse_frontmatter.
+    
+    Args:
+        frontmatter_text: Frontmatter block without its --- delimiters
+        
+    Returns:
+        bool: True when the block is made only of simple top-level fields
+    """
+    return FRONTMATTER_SIMPLE_BLOCK_PATTERN.fullmatch(frontmatter_text + '\n') is not None
+
+
 def generate_frontmatter(metadata: Dict[str, Any]) -> str:
     """
     Generate YAML frontmatter from metadata.
@@ -66,6 +256,31 @@ def generate_frontmatter(metadata: Dict[str, Any]) -> str:
     Returns:
         str: Formatted YAML frontmatter with --- delimiters
     """
+    if not metadata:
+        return EMPTY_FRONTMATTER
+    return f"---\n{_frontmatter_yaml(metadata)}---\n"
+
+
+def generate_frontmatter_bytes(metadata: Dict[str, Any]) -> bytes:
+    """
+    Generate UTF-8 encoded YAML frontmatter from metadata.
+    
+    Lets callers that write to disk build the final file as bytes without
+    first concatenating the frontmatter and body into one large string.
+    
+    Args:
+        metadata: Dictionary of metadata fields
+        
+    Returns:
+        bytes: Formatted YAML frontmatter with --- delimiters
+    """
+    if not metadata:
+        return EMPTY_FRONTMATTER_BYTES
+    return b"---\n" + _frontmatter_yaml(metadata).encode('utf-8') + b"---\n"
+
+
+def _frontmatter_yaml(metadata: Dict[str, Any]) -> str:
+    """Build the YAML body of the frontmatter (without delimiters)."""
     # Ensure system fields come first for consistency
     system_keys = ['processed_datetime', 'note_hash']
     ordered_metadata = {}
@@ -81,11 +296,112 @@ def generate_frontmatter(metadata: Dict[str, Any]) -> str:
             ordered_metadata[key] = value
     
     # Generate YAML
-    yaml_content = yaml.dump(
-        ordered_metadata,
-        default_flow_style=False,
-        allow_unicode=True,
-        sort_keys=False
-    )
+    return _dump_frontmatter(ordered_metadata)
+
+
+def _dump_frontmatter(ordered_metadata: Dict[str, Any]) -> str:
+    """Dump ordered metadata to YAML text (without delimiters)."""
+    if not ordered_metadata:
+        return _yaml_dump(ordered_metadata)
+    
+    # Top-level block mapping entries are emitted independently, so known
+    # fields can be written directly and only runs of other fields go
+    # through PyYAML, in their original order
+    chunks = []
+    pending = {}
+    for key, value in ordered_metadata.items():
+        line = _emit_known_field(key, value)
+        if line is None:
+            pending[key] = value
+            continue
+        if pending:
+            chunks.append(_yaml_dump(pending))
+            pending = {}
+        chunks.append(line)
+    if pending:
+        chunks.append(_yaml_dump(pending))
+    return "".join(chunks)
+
+
+def _emit_known_field(key: str, value: Any) -> Optional[str]:
+    """
+    Emit a system field, simple tag list or plain scalar exactly as PyYAML would.
+    
+    Returns:
+        The field's YAML lines, or None when the value needs the full emitter
+    """
+    pattern = FRONTMATTER_PLAIN_FIELDS.get(key)
+    if pattern is not None:
+        if isinstance(value, str) and pattern.fullmatch(value):
+            return f"{key}: {value}\n"
+        return None
+    if key == 'tags' and type(value) is list:
+        if not value:
+            return "tags: []\n"
+        if set(map(type, value)) == {str}:
+            body = FRONTMATTER_TAG_SEPARATOR.join(value)
+            # A separator inside a tag would make the joined list ambiguous
+            if (body.count(FRONTMATTER_TAG_SEPARATOR) == len(value) - 1
+                    and FRONTMATTER_TAG_LIST_PATTERN.fullmatch(body)):
+                return f"tags:\n- '{body}'\n"
+        return None
     
-    return f"---\n{yaml_content}---\n"
\ No newline at end of file
+    # Scalars are dispatched on their exact type, so bool never passes as int
+    # and str subclasses go to PyYAML
+    emit = _SCALAR_EMITTERS.get(type(value))
+    if emit is None or not _is_plain_key(key):
+        return None
+    scalar = emit(value)
+    if scalar is None or len(key) + len(scalar) + 2 > FRONTMATTER_LINE_WIDTH:
+        return None
+    return f"{key}: {scalar}\n"
+
+
+def _is_plain_key(key: Any) -> bool:
+    """Check whether PyYAML writes a mapping key as a bare word."""
+    return (type(key) is str and key not in FRONTMATTER_RESERVED_WORDS
+            and FRONTMATTER_PLAIN_KEY_PATTERN.fullmatch(key) is not None)
+
+
+def _emit_plain_str(value: str) -> Optional[str]:
+    """Return a string unquoted if PyYAML would, otherwise None."""
+    if value in FRONTMATTER_RESERVED_WORDS or not FRONTMATTER_PLAIN_STRING_PATTERN.fullmatch(value):
+        return None
+    return value
+
+
+def _emit_float(value: float) -> Optional[str]:
+    """Return PyYAML's text for finite floats that repr writes in decimal form."""
+    text = repr(value)
+    if 'e' in text or 'n' in text:  # Exponents, inf and nan need PyYAML's rewriting
+        return None
+    return text
+
+
+_SCALAR_EMITTERS = {
+    str: _emit_plain_str,
+    int: repr,
+    float: _emit_float,
+    bool: lambda value: 'true' if value else 'false',
+    type(None): lambda value: 'null',
+}
+
+
+def _yaml_dump(metadata: Dict[str, Any]) -> str:
+    """Dump metadata with PyYAML, skipping unicode handling for ASCII-only values."""
+    import yaml
+    
+    if _is_ascii(metadata):
+        return yaml.dump(metadata, **FRONTMATTER_ASCII_DUMP_OPTIONS)
+    return yaml.dump(metadata, **FRONTMATTER_DUMP_OPTIONS)
+
+
+def _is_ascii(value: Any) -> bool:
+    """Check whether every string inside a metadata value is pure ASCII."""
+    if isinstance(value, str):
+        return value.isascii()
+    if isinstance(value, dict):
+        return all(_is_ascii(key) and _is_ascii(item) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return all(_is_ascii(item) for item in value)
+    return True
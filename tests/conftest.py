@@ -2,41 +2,112 @@
 
 import sys
 import os
+import json
 import tempfile
 import shutil
 from pathlib import Path
+from types import SimpleNamespace
 from typing import Dict, Any, List
-from unittest.mock import Mock, MagicMock
+from unittest.mock import Mock
 import pytest
 import yaml
 
 # Add src to path so we can import modules
-src_path = Path(__file__).parent.parent / "src"
-sys.path.insert(0, str(src_path))
+src_path = str(Path(__file__).parent.parent / "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+
+# Modules whose tests only exercise mocks; coverage tracing adds overhead there
+# without telling us anything new. Set NO_COV_MOCK_TESTS=1 to skip tracing them.
+MOCK_ONLY_TEST_MODULES = ("test_note_processor.py", "test_pipeline.py")
+NO_COV_ENV_VAR = "NO_COV_MOCK_TESTS"
+
+
+def pytest_configure(config):
+    """Register markers used by the suite even when their plugins aren't installed."""
+    # Modules with module-scoped fixtures set pytestmark to an xdist_group so
+    # --dist loadgroup builds those fixtures on one worker, once
+    config.addinivalue_line("markers", "xdist_group(name): run tests in the same group on one xdist worker")
+    config.addinivalue_line("markers", "no_cover: disable pytest-cov tracing for the test")
+
+
+def pytest_collection_modifyitems(config, items):
+    """Mark mock-only tests no_cover when NO_COV_MOCK_TESTS is set."""
+    if not os.environ.get(NO_COV_ENV_VAR):
+        return
+    for item in items:
+        if item.path.name in MOCK_ONLY_TEST_MODULES:
+            item.add_marker(pytest.mark.no_cover)
+
+
+# Leaf directories of the test vault; parents are created along the way
+VAULT_LEAF_DIRS = (
+    # Standard PARA structure
+    "1-Projects",
+    "2-Areas",
+    "3-Resources",
+    "4-Archive",
+    # Inbox with some subdirectories for testing
+    "0-QuickNotes/meetings",
+    "0-QuickNotes/ideas",
+    "0-QuickNotes/.trash",  # Should be excluded
+)
+
+
+# Memory-backed filesystem used for test vaults when available (Linux)
+TMPFS_DIR = "/dev/shm"
+
+
+@pytest.fixture(scope="session")
+def vault_root():
+    """Create one session-wide parent directory for the per-test vaults."""
+    # Each pytest-xdist worker runs its own session; keep their vaults apart
+    worker = os.environ.get("PYTEST_XDIST_WORKER", "gw0")
+    use_tmpfs = os.path.isdir(TMPFS_DIR) and os.access(TMPFS_DIR, os.W_OK)
+    root = Path(tempfile.mkdtemp(
+        prefix=f"note-vaults-{worker}-",
+        dir=TMPFS_DIR if use_tmpfs else None
+    ))
+    
+    yield root
+    
+    shutil.rmtree(root, ignore_errors=True)
 
 
 @pytest.fixture
-def temp_vault_dir():
+def temp_vault_dir(vault_root):
     """Create a temporary directory structure mimicking an Obsidian vault."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        vault_path = Path(tmpdir)
-        
-        # Create standard PARA structure
-        (vault_path / "0-QuickNotes").mkdir()
-        (vault_path / "1-Projects").mkdir()
-        (vault_path / "2-Areas").mkdir()
-        (vault_path / "3-Resources").mkdir()
-        (vault_path / "4-Archive").mkdir()
-        
-        # Create some subdirectories for testing
-        (vault_path / "0-QuickNotes" / "meetings").mkdir()
-        (vault_path / "0-QuickNotes" / "ideas").mkdir()
-        (vault_path / "0-QuickNotes" / ".trash").mkdir()  # Should be excluded
-        
-        yield vault_path
+    vault_path = Path(tempfile.mkdtemp(dir=vault_root))
+    
+    for leaf_dir in VAULT_LEAF_DIRS:
+        os.makedirs(vault_path / leaf_dir)
+    
+    yield vault_path
+    
+    # Only this test's vault is removed; the session root is reused
+    shutil.rmtree(vault_path, ignore_errors=True)
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
+def prebuilt_vault(vault_root):
+    """
+    Build one canonical vault shared by tests that never modify it.
+    
+    Holds the standard folders plus TestFolder, a hidden .hidden folder and a
+    single 0-QuickNotes/test.md note. Tests that write to the vault must use
+    temp_vault_dir instead.
+    """
+    vault_path = vault_root / "prebuilt"
+    
+    for leaf_dir in VAULT_LEAF_DIRS + ("TestFolder", ".hidden"):
+        os.makedirs(vault_path / leaf_dir)
+    _write_bytes(vault_path / "0-QuickNotes" / "test.md", b"Content")
+    
+    return vault_path
+
+
+@pytest.fixture(scope="session")
 def sample_notes():
     """Provide sample note content for testing."""
     return {
@@ -56,7 +127,13 @@ This note already has frontmatter."""
     }
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
+def sample_notes_bytes(sample_notes):
+    """Provide the sample notes pre-encoded as UTF-8, encoded once per session."""
+    return {name: content.encode('utf-8') for name, content in sample_notes.items()}
+
+
+@pytest.fixture(scope="session")
 def sample_config():
     """Provide a sample configuration for testing."""
     return {
@@ -86,58 +163,79 @@ def sample_config():
     }
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def mock_claude_client():
     """Mock Claude API client for testing."""
     client = Mock()
-    client.send_message = MagicMock(return_value={
-        "content": "# Enhanced Note\n\nThis is the enhanced content.",
+    # Like the real client, return the model's JSON text; tests that need a
+    # different response or a failure override return_value or side_effect
+    client.send_message = Mock(return_value=json.dumps({
+        "content": "# Enhanced Content\n\nThis is better formatted.",
         "metadata": {
-            "summary": "An enhanced test note",
+            "summary": "A test note",
             "tags": ["#test", "#enhanced"],
             "para_category": "resources"
         }
-    })
+    }))
     return client
 
 
-@pytest.fixture
-def mock_config(sample_config, temp_vault_dir):
-    """Create a mock configuration object."""
-    from config import Config
-    
-    # Create a mock config with test values
-    config = Mock(spec=Config)
-    config.obsidian_vault_path = str(temp_vault_dir)
-    config.anthropic_api_key = "test-api-key"
-    config.max_note_size_kb = sample_config["processing"]["max_note_size_kb"]
-    config.max_notes_per_run = sample_config["processing"]["max_notes_per_run"]
-    config.file_patterns = sample_config["processing"]["file_patterns"]
-    config.recursive = sample_config["processing"]["recursive"]
-    config.exclude_folders = sample_config["processing"]["exclude_folders"]
-    config.inbox_folder = sample_config["folders"]["inbox"]
-    config.para_folders = sample_config["folders"]["para"]
-    config.claude_model = sample_config["api_limits"]["claude_model"]
-    config.claude_max_tokens = sample_config["api_limits"]["claude_max_tokens"]
-    config.retry_attempts = sample_config["api_limits"]["retry_attempts"]
-    config.retry_delay_seconds = sample_config["api_limits"]["retry_delay_seconds"]
+@pytest.fixture(scope="module")
+def mock_config(sample_config, prebuilt_vault):
+    """Create a lightweight configuration object with test values."""
+    processing = sample_config["processing"]
+    api_limits = sample_config["api_limits"]
     
-    return config
+    return SimpleNamespace(
+        obsidian_vault_path=str(prebuilt_vault),
+        anthropic_api_key="test-api-key",
+        max_note_size_kb=processing["max_note_size_kb"],
+        max_notes_per_run=processing["max_notes_per_run"],
+        file_patterns=processing["file_patterns"],
+        recursive=processing["recursive"],
+        exclude_folders=processing["exclude_folders"],
+        inbox_folder=sample_config["folders"]["inbox"],
+        para_folders=sample_config["folders"]["para"],
+        claude_model=api_limits["claude_model"],
+        claude_max_tokens=api_limits["claude_max_tokens"],
+        retry_attempts=api_limits["retry_attempts"],
+        retry_delay_seconds=api_limits["retry_delay_seconds"]
+    )
+
+
+def _write_bytes(file_path: Path, data: bytes):
+    """Write bytes with a single open/write/close on a raw descriptor."""
+    fd = os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+@pytest.fixture(scope="session")
+def write_bytes():
+    """Expose _write_bytes to tests that lay out their own files."""
+    return _write_bytes
 
 
 @pytest.fixture
-def create_test_files(temp_vault_dir, sample_notes):
+def create_test_files(temp_vault_dir, sample_notes_bytes):
     """Helper fixture to create test files in the vault."""
     def _create_files(folder_path: str = "0-QuickNotes", files: Dict[str, str] = None):
         if files is None:
-            files = sample_notes
+            encoded_files = sample_notes_bytes
+        else:
+            encoded_files = {name: content.encode('utf-8') for name, content in files.items()}
             
         target_dir = temp_vault_dir / folder_path
+        os.makedirs(target_dir, exist_ok=True)
         created_files = []
         
-        for filename, content in files.items():
+        for filename, data in encoded_files.items():
             file_path = target_dir / filename
-            file_path.write_text(content, encoding='utf-8')
+            _write_bytes(file_path, data)
             created_files.append(file_path)
             
         return created_files
@@ -145,6 +243,23 @@ def create_test_files(temp_vault_dir, sample_notes):
     return _create_files
 
 
+@pytest.fixture(scope="session")
+def make_note():
+    """Factory for Note objects with /path/<name> defaults."""
+    from pipeline import Note
+    
+    def _make_note(name: str = "note.md", content: bytes = b"Content",
+                   file_path: str = None, relative_path: str = ""):
+        return Note(
+            file_path=file_path or f"/path/{name}",
+            name=name,
+            content=content,
+            relative_path=relative_path
+        )
+    
+    return _make_note
+
+
 @pytest.fixture
 def mock_prompt_config():
     """Mock prompt configuration for testing."""
@@ -151,6 +151,15 @@ class TestConfig:
         # Should use YAML value instead of environment
         assert config.obsidian_vault_path == "/yaml/override/path"
     
+    def test_prompts_path_from_yaml(self, env_vars):
+        """Test that a prompts_path setting is loaded from YAML."""
+        with patch('config.Path.exists', return_value=True):
+            with patch('builtins.open', create=True):
+                with patch('yaml.safe_load', return_value={"prompts_path": "/custom/prompts.yaml"}):
+                    config = Config()
+        
+        assert config.prompts_path == "/custom/prompts.yaml"
+    
     def test_empty_vault_path_uses_env(self, env_vars):
         """Test that empty vault path in YAML uses environment variable."""
         config_with_empty_path = {
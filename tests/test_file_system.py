@@ -5,8 +5,28 @@ from pathlib import Path
 from unittest.mock import Mock, patch
 import tempfile
 import os
+import time
 
-from file_system import FileSystemClient
+from file_system import FileSystemClient, READ_CHUNK_SIZE
+
+# Shape of the bulk vault used by the list_files performance guard
+PERF_DIR_COUNT = 100
+PERF_FILES_PER_DIR = 100
+PERF_SLOWDOWN_LIMIT = 3.0  # Allowed list_files time relative to a bare scandir walk
+PERF_TIMING_RUNS = 3       # Best of N runs is compared, to damp scheduler noise
+
+
+@pytest.fixture
+def populated_vault(request):
+    """Create the {folder: {filename: content}} tree given as the parameter."""
+    if not request.param:
+        # Nothing to add, so the shared read-only vault will do
+        return request.getfixturevalue("prebuilt_vault")
+    
+    create_test_files = request.getfixturevalue("create_test_files")
+    for folder_path, files in request.param.items():
+        create_test_files(folder_path, files)
+    return request.getfixturevalue("temp_vault_dir")
 
 
 class TestFileSystemClient:
@@ -15,8 +35,8 @@ class TestFileSystemClient:
     def test_init_valid_path(self, temp_vault_dir):
         """Test initialization with a valid vault path."""
         client = FileSystemClient(str(temp_vault_dir))
-        # Compare resolved paths since macOS may add /private prefix
-        assert client.vault_path.resolve() == temp_vault_dir.resolve()
+        # Compare by inode since macOS may add /private prefix
+        assert os.path.samefile(client.vault_path, temp_vault_dir)
     
     def test_init_invalid_path(self):
         """Test initialization with non-existent path."""
@@ -31,116 +51,97 @@ class TestFileSystemClient:
         with pytest.raises(ValueError, match="Vault path is not a directory"):
             FileSystemClient(str(test_file))
     
-    def test_list_files_non_recursive(self, temp_vault_dir, create_test_files):
-        """Test listing files without recursion."""
-        # Create test files
-        create_test_files("0-QuickNotes", {
-            "note1.md": "Content 1",
-            "note2.txt": "Content 2",
-            "document.pdf": "PDF content"
-        })
+    @pytest.mark.parametrize("populated_vault, list_args, expected_names", [
+        pytest.param(
+            {
+                "0-QuickNotes": {"note1.md": "Content 1", "note2.txt": "Content 2", "document.pdf": "PDF content"},
+                # Subdirectory files should not be included
+                "0-QuickNotes/meetings": {"meeting1.md": "Meeting notes"},
+            },
+            {"folder_name": "0-QuickNotes", "recursive": False},
+            {"note1.md", "note2.txt", "document.pdf"},
+            id="non_recursive",
+        ),
+        pytest.param(
+            {
+                "0-QuickNotes": {"root_note.md": "Root content"},
+                "0-QuickNotes/meetings": {"meeting1.md": "Meeting 1", "meeting2.md": "Meeting 2"},
+                "0-QuickNotes/ideas": {"idea1.txt": "Idea 1"},
+            },
+            {"folder_name": "0-QuickNotes", "recursive": True},
+            {"root_note.md", "meeting1.md", "meeting2.md", "idea1.txt"},
+            id="recursive",
+        ),
+        pytest.param(
+            {
+                "0-QuickNotes": {"visible.md": "Visible"},
+                "0-QuickNotes/.trash": {"deleted.md": "Should be excluded"},
+                "0-QuickNotes/templates": {"template.md": "Should be excluded"},
+            },
+            {"folder_name": "0-QuickNotes", "recursive": True, "exclude_folders": [".trash", "templates"]},
+            {"visible.md"},
+            id="exclude_folders",
+        ),
+        pytest.param(
+            {"0-QuickNotes": {"note.md": "Markdown", "text.txt": "Text", "data.json": "JSON", "script.py": "Python"}},
+            {"folder_name": "0-QuickNotes", "file_patterns": ["*.md"]},
+            {"note.md"},
+            id="single_pattern",
+        ),
+        pytest.param(
+            {"0-QuickNotes": {"note.md": "Markdown", "text.txt": "Text", "data.json": "JSON", "script.py": "Python"}},
+            {"folder_name": "0-QuickNotes", "file_patterns": ["*.md", "*.txt"]},
+            {"note.md", "text.txt"},
+            id="multiple_patterns",
+        ),
+        pytest.param({}, {"folder_name": "1-Projects"}, set(), id="empty_folder"),
+        pytest.param({}, {"folder_name": "NonExistentFolder"}, set(), id="nonexistent_folder"),
+    ], indirect=["populated_vault"])
+    def test_list_files(self, populated_vault, list_args, expected_names):
+        """Test listing files for a range of vault layouts and arguments."""
+        client = FileSystemClient(str(populated_vault))
+        files = client.list_files(**list_args)
         
-        # Also create files in subdirectory (should not be included)
-        create_test_files("0-QuickNotes/meetings", {
-            "meeting1.md": "Meeting notes"
-        })
-        
-        client = FileSystemClient(str(temp_vault_dir))
-        files = client.list_files("0-QuickNotes", recursive=False)
-        
-        # Should only get files in root, not subdirectories
-        assert len(files) == 3
         filenames = [f['name'] for f in files]
-        assert "note1.md" in filenames
-        assert "note2.txt" in filenames
-        assert "document.pdf" in filenames
-        assert "meeting1.md" not in filenames
+        assert len(filenames) == len(expected_names)
+        assert set(filenames) == expected_names
     
-    def test_list_files_recursive(self, temp_vault_dir, create_test_files):
-        """Test listing files with recursion."""
-        # Create test files in root and subdirectories
+    def test_list_files_recursive_subfolder_metadata(self, temp_vault_dir, create_test_files):
+        """Test subfolder and relative path fields for nested files."""
         create_test_files("0-QuickNotes", {
             "root_note.md": "Root content"
         })
         create_test_files("0-QuickNotes/meetings", {
-            "meeting1.md": "Meeting 1",
-            "meeting2.md": "Meeting 2"
-        })
-        create_test_files("0-QuickNotes/ideas", {
-            "idea1.txt": "Idea 1"
+            "meeting1.md": "Meeting 1"
         })
         
         client = FileSystemClient(str(temp_vault_dir))
-        files = client.list_files("0-QuickNotes", recursive=True)
+        files = {f['name']: f for f in client.list_files("0-QuickNotes", recursive=True)}
         
-        # Should get all files including subdirectories
-        assert len(files) == 4
-        filenames = [f['name'] for f in files]
-        assert "root_note.md" in filenames
-        assert "meeting1.md" in filenames
-        assert "meeting2.md" in filenames
-        assert "idea1.txt" in filenames
-        
-        # Check relative paths
-        relative_paths = [f['relative_path'] for f in files]
-        assert "root_note.md" in relative_paths
-        assert str(Path("meetings/meeting1.md")) in relative_paths or "meetings\\meeting1.md" in relative_paths
+        assert files["root_note.md"]['subfolder'] == ""
+        assert files["root_note.md"]['relative_path'] == "root_note.md"
+        assert files["meeting1.md"]['subfolder'] == "meetings"
+        assert files["meeting1.md"]['relative_path'] == os.path.join("meetings", "meeting1.md")
+        assert files["meeting1.md"]['path'] == str(temp_vault_dir.resolve() / "0-QuickNotes" / "meetings" / "meeting1.md")
     
-    def test_exclude_folders_filtering(self, temp_vault_dir, create_test_files):
-        """Test that excluded folders are properly filtered."""
-        # Create directories first
-        (temp_vault_dir / "0-QuickNotes" / "templates").mkdir(exist_ok=True)
-        
-        # Create files in regular and excluded folders
-        create_test_files("0-QuickNotes", {
-            "visible.md": "Visible"
-        })
-        create_test_files("0-QuickNotes/.trash", {
-            "deleted.md": "Should be excluded"
-        })
-        create_test_files("0-QuickNotes/templates", {
-            "template.md": "Should be excluded"
-        })
-        
-        client = FileSystemClient(str(temp_vault_dir))
-        files = client.list_files(
-            "0-QuickNotes", 
-            recursive=True,
-            exclude_folders=[".trash", "templates"]
-        )
-        
-        # Should only get the visible file
-        assert len(files) == 1
-        assert files[0]['name'] == "visible.md"
-    
-    def test_file_pattern_matching(self, temp_vault_dir, create_test_files):
-        """Test file pattern matching."""
-        create_test_files("0-QuickNotes", {
-            "note.md": "Markdown",
-            "text.txt": "Text",
-            "data.json": "JSON",
-            "script.py": "Python"
-        })
+    def test_list_files_skips_unreadable_subfolder(self, temp_vault_dir, create_test_files):
+        """Test that an unreadable subfolder is skipped instead of emptying the listing."""
+        create_test_files("0-QuickNotes", {"root_note.md": "Root content"})
+        create_test_files("0-QuickNotes/meetings", {"meeting1.md": "Meeting 1"})
+        create_test_files("0-QuickNotes/ideas", {"idea1.md": "Idea 1"})
+        
+        # Deny the listing directly, since chmod doesn't stop a root test run
+        real_scandir = os.scandir
+        def scandir(path):
+            if os.path.basename(path) == "meetings":
+                raise PermissionError(13, "Permission denied", path)
+            return real_scandir(path)
         
         client = FileSystemClient(str(temp_vault_dir))
+        with patch("file_system.os.scandir", side_effect=scandir):
+            files = client.list_files("0-QuickNotes", recursive=True)
         
-        # Test with markdown pattern only
-        files = client.list_files(
-            "0-QuickNotes",
-            file_patterns=["*.md"]
-        )
-        assert len(files) == 1
-        assert files[0]['name'] == "note.md"
-        
-        # Test with multiple patterns
-        files = client.list_files(
-            "0-QuickNotes",
-            file_patterns=["*.md", "*.txt"]
-        )
-        assert len(files) == 2
-        filenames = [f['name'] for f in files]
-        assert "note.md" in filenames
-        assert "text.txt" in filenames
+        assert {f['name'] for f in files} == {"root_note.md", "idea1.md"}
     
     def test_read_file_success(self, temp_vault_dir, create_test_files):
         """Test successful file reading."""
@@ -154,6 +155,25 @@ class TestFileSystemClient:
         assert content == b"Test content \xe6\xb5\x8b\xe8\xaf\x95"
         assert content.decode('utf-8') == "Test content 测试"
     
+    def test_read_file_empty(self, temp_vault_dir):
+        """Test reading an empty file."""
+        file_path = temp_vault_dir / "0-QuickNotes" / "empty.md"
+        file_path.write_bytes(b"")
+        
+        client = FileSystemClient(str(temp_vault_dir))
+        
+        assert client.read_file(str(file_path)) == b""
+    
+    def test_read_file_larger_than_chunk(self, temp_vault_dir):
+        """Test reading a file larger than the read chunk size."""
+        data = os.urandom(READ_CHUNK_SIZE * 3 + 17)
+        file_path = temp_vault_dir / "0-QuickNotes" / "large.md"
+        file_path.write_bytes(data)
+        
+        client = FileSystemClient(str(temp_vault_dir))
+        
+        assert client.read_file(str(file_path)) == data
+    
     def test_read_file_not_found(self, temp_vault_dir):
         """Test reading non-existent file."""
         client = FileSystemClient(str(temp_vault_dir))
@@ -249,13 +269,10 @@ class TestFileSystemClient:
         assert backup_path.endswith(".backup.md")
         assert Path(backup_path).read_text() == "Important content"
     
-    def test_get_vault_folders(self, temp_vault_dir):
+    def test_get_vault_folders(self, prebuilt_vault):
         """Test getting list of vault folders."""
-        # Create additional test folders
-        (temp_vault_dir / "TestFolder").mkdir()
-        (temp_vault_dir / ".hidden").mkdir()  # Should be excluded
-        
-        client = FileSystemClient(str(temp_vault_dir))
+        # The prebuilt vault also holds TestFolder and a hidden .hidden folder
+        client = FileSystemClient(str(prebuilt_vault))
         folders = client.get_vault_folders()
         
         # Should include all non-hidden folders
@@ -270,27 +287,10 @@ class TestFileSystemClient:
         # Should be sorted
         assert folders == sorted(folders)
     
-    def test_list_files_empty_folder(self, temp_vault_dir):
-        """Test listing files in empty folder."""
-        client = FileSystemClient(str(temp_vault_dir))
-        files = client.list_files("1-Projects")  # Empty folder
-        
-        assert files == []
-    
-    def test_list_files_nonexistent_folder(self, temp_vault_dir):
-        """Test listing files in non-existent folder."""
-        client = FileSystemClient(str(temp_vault_dir))
-        files = client.list_files("NonExistentFolder")
-        
-        assert files == []
-    
-    def test_file_metadata_structure(self, temp_vault_dir, create_test_files):
+    def test_file_metadata_structure(self, prebuilt_vault):
         """Test that file metadata has correct structure."""
-        create_test_files("0-QuickNotes", {
-            "test.md": "Content"
-        })
-        
-        client = FileSystemClient(str(temp_vault_dir))
+        # The prebuilt vault holds a single 0-QuickNotes/test.md note
+        client = FileSystemClient(str(prebuilt_vault))
         files = client.list_files("0-QuickNotes")
         
         assert len(files) == 1
@@ -330,4 +330,43 @@ class TestFileSystemClient:
                 client.write_file(str(files[0]), b"New content")
         finally:
             # Restore permissions for cleanup
-            os.chmod(files[0], 0o644)
\ No newline at end of file
+            os.chmod(files[0], 0o644)
+
+
+def _scandir_walk(directory):
+    """Baseline walk: recurse with os.scandir and stat every file."""
+    count = 0
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                count += _scandir_walk(entry.path)
+            elif entry.is_file():
+                entry.stat()
+                count += 1
+    return count
+
+
+@pytest.mark.skipif(not os.environ.get("RUN_PERF"), reason="perf: set RUN_PERF=1 to run")
+def test_list_files_performance(temp_vault_dir, write_bytes):
+    """Guard list_files against regressing far behind a plain scandir walk."""
+    bulk_dir = temp_vault_dir / "bulk"
+    for dir_index in range(PERF_DIR_COUNT):
+        sub_dir = bulk_dir / f"dir{dir_index:03d}"
+        os.makedirs(sub_dir)
+        for file_index in range(PERF_FILES_PER_DIR):
+            write_bytes(sub_dir / f"note{file_index:03d}.md", b"x")
+    
+    client = FileSystemClient(str(temp_vault_dir))
+    
+    baseline = elapsed = float("inf")
+    for _ in range(PERF_TIMING_RUNS):
+        t0 = time.perf_counter()
+        expected_count = _scandir_walk(bulk_dir)
+        baseline = min(baseline, time.perf_counter() - t0)
+        
+        t0 = time.perf_counter()
+        files = client.list_files("bulk", recursive=True)
+        elapsed = min(elapsed, time.perf_counter() - t0)
+    
+    assert len(files) == expected_count == PERF_DIR_COUNT * PERF_FILES_PER_DIR
+    assert elapsed < baseline * PERF_SLOWDOWN_LIMIT
@@ -1,19 +1,45 @@
 """Tests for the LLM abstraction layer."""
 
 import pytest
-from unittest.mock import Mock, patch, MagicMock
-import sys
-from pathlib import Path
-
-# Add src to path
-src_path = Path(__file__).parent.parent / "src"
-sys.path.insert(0, str(src_path))
+from unittest.mock import Mock, MagicMock
+from dataclasses import dataclass
 
 from llm.base_client import BaseLLMClient
 from llm.factory import create_llm_client, create_llm_client_with_fallback, list_available_providers
 from llm.claude_client_wrapper import ClaudeClientWrapper
 
 
+@dataclass
+class FakeConfig:
+    """Plain configuration object for the wrapper and factory tests."""
+    # Declared by hand rather than via slots=True, which needs Python 3.10
+    __slots__ = ('anthropic_api_key', 'claude_model', 'claude_max_tokens', 'retry_attempts', 'llm')
+    
+    anthropic_api_key: str
+    claude_model: str
+    claude_max_tokens: int
+    retry_attempts: int
+    llm: dict
+
+
+class _StubClient(BaseLLMClient):
+    """Minimal concrete client for exercising BaseLLMClient defaults."""
+    
+    def send_message(self, prompt, **kwargs):
+        return "test"
+    
+    def send_multimodal_message(self, prompt, image_data, image_media_type, **kwargs):
+        return "test"
+    
+    @property
+    def provider_name(self):
+        return "test"
+    
+    @property
+    def model_name(self):
+        return "test-model"
+
+
 class TestBaseLLMClient:
     """Test the base LLM client abstract class."""
     
@@ -23,123 +49,81 @@ class TestBaseLLMClient:
         with pytest.raises(TypeError):
             BaseLLMClient(Mock())
     
-    def test_supports_multimodal_default(self):
-        """Test default multimodal support check."""
-        # Create a concrete implementation for testing
-        class TestClient(BaseLLMClient):
-            def send_message(self, prompt, **kwargs):
-                return "test"
-            
-            def send_multimodal_message(self, prompt, image_data, image_media_type, **kwargs):
-                return "test"
-            
-            @property
-            def provider_name(self):
-                return "test"
-            
-            @property
-            def model_name(self):
-                return "test-model"
-        
-        client = TestClient(Mock())
-        assert client.supports_multimodal() is True
-    
-    def test_get_usage_info_default(self):
-        """Test default usage info returns None."""
-        class TestClient(BaseLLMClient):
-            def send_message(self, prompt, **kwargs):
-                return "test"
-            
-            def send_multimodal_message(self, prompt, image_data, image_media_type, **kwargs):
-                return "test"
-            
-            @property
-            def provider_name(self):
-                return "test"
-            
-            @property
-            def model_name(self):
-                return "test-model"
-        
-        client = TestClient(Mock())
-        assert client.get_usage_info() is None
-    
-    def test_validate_config_default(self):
-        """Test default config validation."""
-        class TestClient(BaseLLMClient):
-            def send_message(self, prompt, **kwargs):
-                return "test"
-            
-            def send_multimodal_message(self, prompt, image_data, image_media_type, **kwargs):
-                return "test"
-            
-            @property
-            def provider_name(self):
-                return "test"
-            
-            @property
-            def model_name(self):
-                return "test-model"
-        
-        # Test with valid config
-        config = Mock()
-        config.llm = {"test": "value"}
-        client = TestClient(config)
-        assert client.validate_config() is True
-        
-        # Test with invalid config
+    @pytest.mark.parametrize("attr,expected", [
+        ("supports_multimodal", True),
+        ("get_usage_info", None),
+        ("validate_config", True),
+    ])
+    def test_default_methods(self, attr, expected):
+        """Test the default implementations of the optional methods."""
+        client = _StubClient(Mock())
+        assert getattr(client, attr)() is expected
+    
+    def test_validate_config_missing_llm(self):
+        """Test default config validation with no llm section."""
         config_invalid = Mock()
         config_invalid.llm = None
-        client_invalid = TestClient(config_invalid)
+        client_invalid = _StubClient(config_invalid)
         assert client_invalid.validate_config() is False
 
 
+@pytest.fixture(scope="class")
+def wrapper_config():
+    """Configuration shared by the Claude wrapper tests."""
+    return FakeConfig(
+        anthropic_api_key="test-key",
+        claude_model="claude-3-opus-20240229",
+        claude_max_tokens=4096,
+        retry_attempts=3,
+        llm={}
+    )
+
+
+@pytest.fixture(scope="class")
+def patched_wrapper(wrapper_config):
+    """Build one wrapper, with ClaudeClient patched, shared by the class."""
+    mock_claude_client_class = MagicMock()
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr('llm.claude_client_wrapper.ClaudeClient', mock_claude_client_class)
+        yield ClaudeClientWrapper(wrapper_config), mock_claude_client_class
+
+
 class TestClaudeClientWrapper:
     """Test the Claude client wrapper."""
     
     @pytest.fixture
-    def mock_config(self):
-        """Mock configuration for testing."""
-        config = Mock()
-        config.anthropic_api_key = "test-key"
-        config.claude_model = "claude-3-opus-20240229"
-        config.claude_max_tokens = 4096
-        config.retry_attempts = 3
-        return config
+    def wrapper(self, patched_wrapper):
+        """Provide the shared wrapper, resetting its Claude client mock after each test."""
+        wrapper, _ = patched_wrapper
+        yield wrapper
+        wrapper.claude_client.reset_mock(return_value=True, side_effect=True)
     
-    @patch('llm.claude_client_wrapper.ClaudeClient')
-    def test_initialization(self, mock_claude_client_class, mock_config):
+    def test_initialization(self, patched_wrapper, wrapper_config):
         """Test Claude wrapper initialization."""
-        wrapper = ClaudeClientWrapper(mock_config)
+        wrapper, mock_claude_client_class = patched_wrapper
         
         # Check that original Claude client was created
-        mock_claude_client_class.assert_called_once_with(mock_config)
+        mock_claude_client_class.assert_called_once_with(wrapper_config)
         assert wrapper.claude_client == mock_claude_client_class.return_value
         assert wrapper.model_name == "claude-3-opus-20240229"
         assert wrapper.provider_name == "anthropic/claude"
     
-    @patch('llm.claude_client_wrapper.ClaudeClient')
-    def test_send_message(self, mock_claude_client_class, mock_config):
+    def test_send_message(self, wrapper):
         """Test sending message through wrapper."""
-        mock_claude_client = mock_claude_client_class.return_value
+        mock_claude_client = wrapper.claude_client
         mock_claude_client.send_message.return_value = "Enhanced response"
         
-        wrapper = ClaudeClientWrapper(mock_config)
-        
         prompt = {"user": "Test prompt", "system": "System prompt"}
         result = wrapper.send_message(prompt)
         
         mock_claude_client.send_message.assert_called_once_with(prompt, max_retries=3)
         assert result == "Enhanced response"
     
-    @patch('llm.claude_client_wrapper.ClaudeClient')
-    def test_send_multimodal_message(self, mock_claude_client_class, mock_config):
+    def test_send_multimodal_message(self, wrapper):
         """Test sending multimodal message through wrapper."""
-        mock_claude_client = mock_claude_client_class.return_value
+        mock_claude_client = wrapper.claude_client
         mock_claude_client.send_multimodal_message.return_value = "Multimodal response"
         
-        wrapper = ClaudeClientWrapper(mock_config)
-        
         prompt = {"user": "Describe this image"}
         image_data = b"fake image data"
         image_type = "image/jpeg"
@@ -151,32 +135,23 @@ class TestClaudeClientWrapper:
         )
         assert result == "Multimodal response"
     
-    @patch('llm.claude_client_wrapper.ClaudeClient')
-    def test_supports_multimodal(self, mock_claude_client_class, mock_config):
+    def test_supports_multimodal(self, wrapper):
         """Test multimodal support detection."""
-        wrapper = ClaudeClientWrapper(mock_config)
-        
         # Claude 3 models support multimodal
         assert wrapper.supports_multimodal() is True
     
-    @patch('llm.claude_client_wrapper.ClaudeClient')
-    def test_validate_config_valid(self, mock_claude_client_class, mock_config):
+    def test_validate_config_valid(self, wrapper):
         """Test config validation with valid config."""
-        wrapper = ClaudeClientWrapper(mock_config)
         assert wrapper.validate_config() is True
     
-    @patch('llm.claude_client_wrapper.ClaudeClient')
-    def test_validate_config_missing_api_key(self, mock_claude_client_class, mock_config):
+    def test_validate_config_missing_api_key(self, wrapper, wrapper_config, monkeypatch):
         """Test config validation with missing API key."""
-        mock_config.anthropic_api_key = ""
-        wrapper = ClaudeClientWrapper(mock_config)
+        monkeypatch.setattr(wrapper_config, "anthropic_api_key", "")
         assert wrapper.validate_config() is False
     
-    @patch('llm.claude_client_wrapper.ClaudeClient')
-    def test_validate_config_missing_model(self, mock_claude_client_class, mock_config):
+    def test_validate_config_missing_model(self, wrapper, monkeypatch):
         """Test config validation with missing model."""
-        wrapper = ClaudeClientWrapper(mock_config)
-        wrapper._model = ""
+        monkeypatch.setattr(wrapper, "_model", "")
         assert wrapper.validate_config() is False
 
 
@@ -185,21 +160,35 @@ class TestLLMFactory:
     
     @pytest.fixture
     def mock_config(self):
-        """Mock configuration for testing."""
-        config = Mock()
-        config.llm = {
-            'primary_provider': 'claude_direct',
-            'fallback_provider': 'litellm',
-            'providers': {
-                'claude_direct': {'model': 'claude-3-opus'},
-                'litellm': {'model': 'claude-3-sonnet'}
+        """Configuration for testing."""
+        return FakeConfig(
+            anthropic_api_key="test-key",
+            claude_model="claude-3-opus-20240229",
+            claude_max_tokens=4096,
+            retry_attempts=3,
+            llm={
+                'primary_provider': 'claude_direct',
+                'fallback_provider': 'litellm',
+                'providers': {
+                    'claude_direct': {'model': 'claude-3-opus'},
+                    'litellm': {'model': 'claude-3-sonnet'}
+                }
             }
-        }
-        config.anthropic_api_key = "test-key"
-        config.claude_model = "claude-3-opus-20240229"
-        config.claude_max_tokens = 4096
-        config.retry_attempts = 3
-        return config
+        )
+    
+    @pytest.fixture
+    def mock_claude_client_class(self, monkeypatch):
+        """Patch the ClaudeClient used by the Claude wrapper."""
+        mock_claude_client_class = MagicMock()
+        monkeypatch.setattr('llm.claude_client_wrapper.ClaudeClient', mock_claude_client_class)
+        return mock_claude_client_class
+    
+    @pytest.fixture
+    def mock_create_client(self, monkeypatch):
+        """Patch create_llm_client as seen by the fallback helper."""
+        mock_create_client = MagicMock()
+        monkeypatch.setattr('llm.factory.create_llm_client', mock_create_client)
+        return mock_create_client
     
     def test_list_available_providers(self):
         """Test listing available providers."""
@@ -208,7 +197,6 @@ class TestLLMFactory:
         assert 'litellm' in providers
         assert isinstance(providers, list)
     
-    @patch('llm.claude_client_wrapper.ClaudeClient')
     def test_create_llm_client_claude_direct(self, mock_claude_client_class, mock_config):
         """Test creating Claude direct client."""
         client = create_llm_client(mock_config, 'claude_direct')
@@ -222,7 +210,6 @@ class TestLLMFactory:
         with pytest.raises(ValueError, match="Unsupported LLM provider"):
             create_llm_client(mock_config, 'unsupported_provider')
     
-    @patch('llm.claude_client_wrapper.ClaudeClient')
     def test_create_llm_client_from_config(self, mock_claude_client_class, mock_config):
         """Test creating client using config primary provider."""
         mock_config.llm['primary_provider'] = 'claude_direct'
@@ -232,7 +219,6 @@ class TestLLMFactory:
         assert isinstance(client, ClaudeClientWrapper)
         assert client.provider_name == "anthropic/claude"
     
-    @patch('llm.claude_client_wrapper.ClaudeClient')
     def test_create_llm_client_with_fallback_success(self, mock_claude_client_class, mock_config):
         """Test creating client with fallback - primary succeeds."""
         client = create_llm_client_with_fallback(mock_config)
@@ -240,7 +226,6 @@ class TestLLMFactory:
         assert isinstance(client, ClaudeClientWrapper)
         assert client.provider_name == "anthropic/claude"
     
-    @patch('llm.factory.create_llm_client')
     def test_create_llm_client_with_fallback_uses_fallback(self, mock_create_client, mock_config):
         """Test creating client with fallback - primary fails, fallback succeeds."""
         # Mock primary provider failure, fallback success
@@ -262,7 +247,6 @@ class TestLLMFactory:
         assert client == mock_fallback_client
         assert mock_create_client.call_count == 2  # Primary + fallback
     
-    @patch('llm.factory.create_llm_client')
     def test_create_llm_client_with_fallback_all_fail(self, mock_create_client, mock_config):
         """Test creating client with fallback - all providers fail."""
         mock_create_client.side_effect = Exception("All providers failed")
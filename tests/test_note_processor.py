@@ -1,39 +1,89 @@
 """Tests for the note processor module."""
 
+import logging
+
 import pytest
-from unittest.mock import Mock, MagicMock, call, patch
+from unittest.mock import Mock
 from pathlib import Path
 
 from note_processor import NoteProcessor
 from pipeline import Note, ProcessingResult
 
+pytestmark = pytest.mark.xdist_group("note_processor")
 
-class TestNoteProcessor:
-    """Test the NoteProcessor class."""
-    
-    @pytest.fixture
-    def mock_pipeline(self):
-        """Mock pipeline for testing."""
-        pipeline = Mock()
-        pipeline.file_client = Mock()
-        pipeline.process_note = MagicMock(return_value=(True, ProcessingResult.SUCCESS))
-        return pipeline
+# Shared file listings; tests never modify them
+_FILES_1 = (
+    {'path': '/path/note.md', 'name': 'note.md', 'size': 100, 'modified_time': 1},
+)
+_FILES_3 = tuple(
+    {'path': f'/path/note{i}.md', 'name': f'note{i}.md', 'size': 100, 'modified_time': i}
+    for i in range(1, 4)
+)
+_FILES_5 = tuple(
+    {'path': f'/path/note{i}.md', 'name': f'note{i}.md', 'size': 100, 'modified_time': i}
+    for i in range(5)
+)
+_FILES_WITH_PROCESSED = (
+    {'path': '/path/note1.md', 'name': 'note1.md', 'size': 100, 'modified_time': 1},
+    {'path': '/path/_processed.md', 'name': '_processed.md', 'size': 100, 'modified_time': 2},
+    {'path': '/path/note2.md', 'name': 'note2.md', 'size': 100, 'modified_time': 3},
+)
+
+
+def _collect_processed(mock_pipeline):
+    """Record each note handed to process_note, which then succeeds."""
+    processed = []
     
-    @pytest.fixture
-    def mock_config(self):
-        """Mock configuration for testing."""
-        config = Mock()
-        config.inbox_folder = "0-QuickNotes"
-        config.max_notes_per_run = 5
-        config.recursive = True
-        config.file_patterns = ["*.md", "*.txt"]
-        config.exclude_folders = [".trash"]
-        return config
+    def _process_note(note):
+        processed.append(note)
+        return True, ProcessingResult.SUCCESS
     
-    @pytest.fixture
-    def note_processor(self, mock_pipeline, mock_config):
-        """Create a NoteProcessor instance."""
-        return NoteProcessor(mock_pipeline, mock_config)
+    mock_pipeline.process_note.side_effect = _process_note
+    return processed
+
+
+@pytest.fixture(scope="module")
+def mock_pipeline():
+    """Mock pipeline shared by the module; reset after every test."""
+    pipeline = Mock()
+    pipeline.file_client = Mock()
+    pipeline.process_note = Mock(return_value=(True, ProcessingResult.SUCCESS))
+    return pipeline
+
+
+@pytest.fixture(scope="module")
+def mock_config():
+    """Mock configuration shared by the module."""
+    config = Mock()
+    config.inbox_folder = "0-QuickNotes"
+    config.max_notes_per_run = 5
+    config.recursive = True
+    config.file_patterns = ["*.md", "*.txt"]
+    config.exclude_folders = [".trash"]
+    return config
+
+
+@pytest.fixture(scope="module")
+def note_processor(mock_pipeline, mock_config):
+    """Create a NoteProcessor instance shared by the module."""
+    return NoteProcessor(mock_pipeline, mock_config)
+
+
+@pytest.fixture(autouse=True)
+def _reset_mock_pipeline(mock_pipeline):
+    """Clear calls and per-test configuration from the shared pipeline mock."""
+    yield
+    # Reset only the mocks tests configure, not the whole child-mock tree
+    file_client = mock_pipeline.file_client
+    file_client.list_files.reset_mock()
+    file_client.list_files.return_value = []
+    file_client.read_file.reset_mock(return_value=True, side_effect=True)
+    mock_pipeline.process_note.reset_mock(side_effect=True)
+    mock_pipeline.process_note.return_value = (True, ProcessingResult.SUCCESS)
+
+
+class TestNoteProcessor:
+    """Test the NoteProcessor class."""
     
     def test_process_notes_empty_folder(self, note_processor, mock_pipeline):
         """Test processing when no files are found."""
@@ -67,91 +117,73 @@ class TestNoteProcessor:
         mock_pipeline.process_note.assert_called_once()
         
         # Check Note object was created correctly
-        note_arg = mock_pipeline.process_note.call_args[0][0]
+        note_arg = mock_pipeline.process_note.call_args.args[0]
         assert isinstance(note_arg, Note)
         assert note_arg.name == 'note.md'
         assert note_arg.content == b"Test content"
     
     def test_process_notes_filters_underscore_files(self, note_processor, mock_pipeline):
         """Test that files starting with underscore are filtered out."""
-        mock_pipeline.file_client.list_files.return_value = [
-            {'path': '/path/note1.md', 'name': 'note1.md', 'size': 100, 'modified_time': 1},
-            {'path': '/path/_processed.md', 'name': '_processed.md', 'size': 100, 'modified_time': 2},
-            {'path': '/path/note2.md', 'name': 'note2.md', 'size': 100, 'modified_time': 3}
-        ]
+        mock_pipeline.file_client.list_files.return_value = _FILES_WITH_PROCESSED
         
         mock_pipeline.file_client.read_file.return_value = b"Content"
+        processed = _collect_processed(mock_pipeline)
         
         result = note_processor.process_notes()
         
         # Should only process 2 files (excluding _processed.md)
         assert result == 2
-        assert mock_pipeline.process_note.call_count == 2
+        assert len(processed) == 2
         
         # Verify the right files were processed
-        processed_names = [
-            call[0][0].name for call in mock_pipeline.process_note.call_args_list
-        ]
+        processed_names = [note.name for note in processed]
         assert 'note1.md' in processed_names
         assert 'note2.md' in processed_names
         assert '_processed.md' not in processed_names
     
-    def test_process_notes_respects_max_limit(self, note_processor, mock_pipeline, mock_config):
+    def test_process_notes_respects_max_limit(self, note_processor, mock_pipeline, mock_config, monkeypatch):
         """Test that max_notes_per_run limit is respected."""
-        mock_config.max_notes_per_run = 2
+        monkeypatch.setattr(mock_config, "max_notes_per_run", 2)
         
-        # Create 5 files
-        files = [
-            {'path': f'/path/note{i}.md', 'name': f'note{i}.md', 
-             'size': 100, 'modified_time': i}
-            for i in range(5)
-        ]
-        mock_pipeline.file_client.list_files.return_value = files
+        mock_pipeline.file_client.list_files.return_value = _FILES_5
         mock_pipeline.file_client.read_file.return_value = b"Content"
+        processed = _collect_processed(mock_pipeline)
         
         result = note_processor.process_notes()
         
         # Should only process 2 files due to limit
         assert result == 2
-        assert mock_pipeline.process_note.call_count == 2
+        assert len(processed) == 2
     
-    def test_process_notes_handles_processing_failure(self, note_processor, mock_pipeline):
-        """Test handling when a note fails to process."""
-        mock_pipeline.file_client.list_files.return_value = [
-            {'path': '/path/note1.md', 'name': 'note1.md', 'size': 100, 'modified_time': 1},
-            {'path': '/path/note2.md', 'name': 'note2.md', 'size': 100, 'modified_time': 2},
-            {'path': '/path/note3.md', 'name': 'note3.md', 'size': 100, 'modified_time': 3}
-        ]
-        
+    @pytest.mark.parametrize("files, read_side_effect, process_side_effect, expected_result, expected_calls", [
+        pytest.param(
+            _FILES_3, None,
+            [(True, ProcessingResult.SUCCESS), (False, ProcessingResult.LLM_FAILED), (True, ProcessingResult.SUCCESS)],
+            2, 3, id="processing_failure",
+        ),
+        pytest.param(
+            _FILES_3, None,
+            [(True, ProcessingResult.SUCCESS), RuntimeError("Pipeline crashed"), (True, ProcessingResult.SUCCESS)],
+            2, 3, id="processing_exception",
+        ),
+        pytest.param(_FILES_1, IOError("Read failed"), None, 0, 0, id="read_error"),
+        pytest.param(
+            _FILES_3, [b"Content", IOError("Read failed"), b"Content"], None,
+            2, 2, id="partial_read_error",
+        ),
+    ])
+    def test_process_notes_failure_paths(self, note_processor, mock_pipeline, files, read_side_effect,
+                                         process_side_effect, expected_result, expected_calls):
+        """Test that a failing note is skipped without stopping the batch."""
+        mock_pipeline.file_client.list_files.return_value = files
         mock_pipeline.file_client.read_file.return_value = b"Content"
-        
-        # Configure pipeline to fail on second note
-        mock_pipeline.process_note.side_effect = [
-            (True, ProcessingResult.SUCCESS), 
-            (False, ProcessingResult.LLM_FAILED), 
-            (True, ProcessingResult.SUCCESS)
-        ]
-        
-        result = note_processor.process_notes()
-        
-        # Should process all 3, but only 2 succeed
-        assert result == 2
-        assert mock_pipeline.process_note.call_count == 3
-    
-    def test_process_notes_handles_read_error(self, note_processor, mock_pipeline):
-        """Test handling when file reading fails."""
-        mock_pipeline.file_client.list_files.return_value = [
-            {'path': '/path/note.md', 'name': 'note.md', 'size': 100, 'modified_time': 1}
-        ]
-        
-        # Configure read to fail
-        mock_pipeline.file_client.read_file.side_effect = IOError("Read failed")
+        mock_pipeline.file_client.read_file.side_effect = read_side_effect
+        mock_pipeline.process_note.side_effect = process_side_effect
         
         result = note_processor.process_notes()
         
-        # Should handle error gracefully
-        assert result == 0
-        mock_pipeline.process_note.assert_not_called()
+        assert result == expected_result
+        assert mock_pipeline.process_note.call_count == expected_calls
     
     def test_create_note_from_file(self, note_processor, mock_pipeline):
         """Test creating Note object from file info."""
@@ -187,24 +219,35 @@ class TestNoteProcessor:
             exclude_folders=[".trash"]
         )
     
-    def test_process_notes_logging(self, note_processor, mock_pipeline):
-        """Test that appropriate logging occurs during processing."""
-        mock_pipeline.file_client.list_files.return_value = [
-            {'path': '/path/note.md', 'name': 'note.md', 'size': 100, 'modified_time': 1}
-        ]
+    @pytest.mark.parametrize("success, result, level, message", [
+        pytest.param(True, ProcessingResult.SUCCESS, logging.INFO,
+                     "Successfully processed: note.md", id="success"),
+        pytest.param(False, ProcessingResult.FILTERED, logging.INFO,
+                     "Note filtered out: note.md", id="filtered"),
+        pytest.param(False, ProcessingResult.VALIDATION_FAILED, logging.WARNING,
+                     "Note validation failed: note.md", id="validation_failed"),
+        pytest.param(False, ProcessingResult.LLM_FAILED, logging.ERROR,
+                     "LLM processing failed: note.md", id="llm_failed"),
+        pytest.param(False, ProcessingResult.ERROR, logging.ERROR,
+                     "Failed to process: note.md (reason: error)", id="error"),
+    ])
+    def test_process_notes_logging(self, note_processor, mock_pipeline, caplog,
+                                   success, result, level, message):
+        """Test that each processing result is logged at the appropriate level."""
+        mock_pipeline.file_client.list_files.return_value = _FILES_1
         mock_pipeline.file_client.read_file.return_value = b"Content"
-        mock_pipeline.process_note.return_value = (True, ProcessingResult.SUCCESS)
+        mock_pipeline.process_note.return_value = (success, result)
+        
+        caplog.set_level(logging.INFO, logger="note_processor")
+        processed = note_processor.process_notes()
         
-        with patch('note_processor.logger') as mock_logger:
-            result = note_processor.process_notes()
+        assert processed == (1 if success else 0)
+        assert any(r.levelno == level and message in r.message for r in caplog.records)
         
-        # Check key log messages
-        assert any('Starting note processing batch' in str(call) 
-                  for call in mock_logger.info.call_args_list)
-        assert any('Successfully processed: note.md' in str(call) 
-                  for call in mock_logger.info.call_args_list)
-        assert any('Batch complete' in str(call) 
-                  for call in mock_logger.info.call_args_list)
+        # Batch start and end are always logged
+        info_messages = [r.message for r in caplog.records if r.levelno == logging.INFO]
+        assert any('Starting note processing batch' in m for m in info_messages)
+        assert any('Batch complete' in m for m in info_messages)
     
     def test_process_notes_with_subdirectories(self, note_processor, mock_pipeline):
         """Test processing notes in subdirectories."""
@@ -228,50 +271,12 @@ class TestNoteProcessor:
         ]
         
         mock_pipeline.file_client.read_file.return_value = b"Content"
+        processed = _collect_processed(mock_pipeline)
         
         result = note_processor.process_notes()
         
         assert result == 2
         
         # Verify both files were processed with correct relative paths
-        notes = [call[0][0] for call in mock_pipeline.process_note.call_args_list]
-        assert any(note.relative_path == 'root.md' for note in notes)
-        assert any(note.relative_path == 'meetings/meeting1.md' for note in notes)
-    
-    def test_process_notes_logging_filtered_results(self, note_processor, mock_pipeline):
-        """Test logging for filtered processing results."""
-        mock_pipeline.file_client.list_files.return_value = [
-            {'path': '/path/note1.md', 'name': 'note1.md', 'size': 100, 'modified_time': 1},
-            {'path': '/path/note2.md', 'name': 'note2.md', 'size': 100, 'modified_time': 2}
-        ]
-        mock_pipeline.file_client.read_file.return_value = b"Content"
-        mock_pipeline.process_note.side_effect = [
-            (False, ProcessingResult.FILTERED),
-            (False, ProcessingResult.VALIDATION_FAILED)
-        ]
-        
-        with patch('note_processor.logger') as mock_logger:
-            result = note_processor.process_notes()
-        
-        # Should log appropriate messages for different failure types
-        assert any('Note filtered out: note1.md' in str(call) 
-                  for call in mock_logger.info.call_args_list)
-        assert any('Note validation failed: note2.md' in str(call) 
-                  for call in mock_logger.warning.call_args_list)
-        assert result == 0
-    
-    def test_process_notes_logging_llm_errors(self, note_processor, mock_pipeline):
-        """Test logging for LLM processing errors."""
-        mock_pipeline.file_client.list_files.return_value = [
-            {'path': '/path/note.md', 'name': 'note.md', 'size': 100, 'modified_time': 1}
-        ]
-        mock_pipeline.file_client.read_file.return_value = b"Content"
-        mock_pipeline.process_note.return_value = (False, ProcessingResult.LLM_FAILED)
-        
-        with patch('note_processor.logger') as mock_logger:
-            result = note_processor.process_notes()
-        
-        # Should log error for LLM failure
-        assert any('LLM processing failed: note.md' in str(call) 
-                  for call in mock_logger.error.call_args_list)
-        assert result == 0
\ No newline at end of file
+        assert any(note.relative_path == 'root.md' for note in processed)
+        assert any(note.relative_path == 'meetings/meeting1.md' for note in processed)
@@ -1,12 +1,61 @@
 """Tests for the note processing pipeline."""
 
+import json
+
 import pytest
-from unittest.mock import Mock, MagicMock, patch
+from unittest.mock import Mock, patch
 from datetime import datetime, timezone
 from pathlib import Path
 
 from pipeline import Note, NotePipeline, ProcessingResult
-from utils import calculate_file_hash, generate_frontmatter
+from utils import calculate_file_hash, generate_frontmatter, parse_frontmatter
+
+pytestmark = pytest.mark.xdist_group("pipeline")
+
+# Hashes of fixed test content, computed once at import
+# (body text as it appears after frontmatter extraction, with leading newline)
+_HASH_UNCHANGED = calculate_file_hash("\nTest content without frontmatter")
+_HASH_UNCHANGED_PROCESS = calculate_file_hash("\nUnchanged content")
+_RAW_NOTE = "# My Raw Note\n\nThis is my original unprocessed text with typos and bad formating."
+_RAW_NOTE_BYTES = _RAW_NOTE.encode('utf-8')
+_CLEANED_NOTE = "# My Processed Note\n\nThis is the cleaned and formatted text."
+_HASH_COMBINED = calculate_file_hash(
+    _CLEANED_NOTE + "\n\n---\n## Original Note\n---\n\n" + _RAW_NOTE
+)
+
+# Previously processed notes whose note_hash matches their body, pre-encoded
+_FM_HEAD = b'---\nprocessed_datetime: "2025-01-01T12:00:00Z"\nnote_hash: "'
+_FM_TAIL = b'"\nsummary: "Test"\ntags:\n- \'#test\'\n---\n\n'
+_NOTE_UNCHANGED = _FM_HEAD + _HASH_UNCHANGED.encode('ascii') + _FM_TAIL + b"Test content without frontmatter"
+_NOTE_UNCHANGED_PROCESS = _FM_HEAD + _HASH_UNCHANGED_PROCESS.encode('ascii') + _FM_TAIL + b"Unchanged content"
+
+# LLM responses (the Claude client returns JSON strings), encoded once at import
+_CLAUDE_FULL = json.dumps({
+    "content": "# Enhanced Note\n\nEnhanced content",
+    "metadata": {
+        "summary": "An enhanced note",
+        "tags": ["#enhanced"]
+    }
+})
+_CLAUDE_CLEANED = json.dumps({
+    "content": _CLEANED_NOTE,
+    "metadata": {
+        "summary": "A cleaned note",
+        "tags": ["#cleaned"]
+    }
+})
+_CLAUDE_MINIMAL = json.dumps({
+    "content": "Enhanced version",
+    "metadata": {"summary": "Test", "tags": []}
+})
+
+# UTF-8 encodings of sample_note content, reused across parametrized cases
+_ENCODED_CONTENT = {}
+
+# Payload just under 2KB, over a 1KB size limit
+_PAYLOAD_2KB = b"X" * 2000
+# Payload of about 50 bytes, over a 0.001KB size limit
+_PAYLOAD_OVER_TINY = b"This content is too large for the configured limit"
 
 
 class TestNote:
@@ -42,69 +91,59 @@ class TestNote:
         assert note.relative_path == "note.md"
 
 
+@pytest.fixture(scope="module")
+def mock_file_client():
+    """Mock file client shared by the module; reset after every test."""
+    # rename_file/update_file are auto-created child mocks
+    return Mock()
+
+
+@pytest.fixture(scope="module")
+def pipeline(mock_file_client, mock_claude_client, mock_config):
+    """Create a pipeline instance shared by the module."""
+    return NotePipeline(mock_file_client, mock_claude_client, mock_config)
+
+
+@pytest.fixture(autouse=True)
+def _reset_mock_clients(mock_file_client, mock_claude_client):
+    """Clear calls and per-test configuration from the shared client mocks."""
+    default_response = mock_claude_client.send_message.return_value
+    yield
+    # Reset only the mocks the pipeline calls, not the whole child-mock tree
+    mock_file_client.rename_file.reset_mock(side_effect=True)
+    mock_file_client.update_file.reset_mock(side_effect=True)
+    mock_claude_client.send_message.reset_mock(side_effect=True)
+    mock_claude_client.send_message.return_value = default_response
+
+
 class TestNotePipeline:
     """Test the NotePipeline class."""
     
     @pytest.fixture
-    def mock_file_client(self):
-        """Mock file client for testing."""
-        client = Mock()
-        client.rename_file = MagicMock()
-        client.update_file = MagicMock()
-        return client
-    
-    @pytest.fixture
-    def pipeline(self, mock_file_client, mock_claude_client, mock_config):
-        """Create a pipeline instance for testing."""
-        return NotePipeline(mock_file_client, mock_claude_client, mock_config)
-    
-    @pytest.fixture
-    def sample_note(self):
-        """Helper fixture to create sample notes."""
+    def sample_note(self, make_note):
+        """Helper fixture to create sample notes from text content."""
         def _create_note(name: str, content: str):
-            return Note(
-                file_path=f"/path/{name}",
-                name=name,
-                content=content.encode('utf-8')
-            )
+            data = _ENCODED_CONTENT.get(content)
+            if data is None:
+                data = _ENCODED_CONTENT[content] = content.encode('utf-8')
+            return make_note(name, data)
         return _create_note
     
-    def test_filter_already_processed_files(self, pipeline):
+    def test_filter_already_processed_files(self, pipeline, make_note):
         """Test filtering of files with underscore prefix."""
-        note = Note(
-            file_path="/path/_processed.md",
-            name="_processed.md",
-            content=b"Content"
-        )
+        note = make_note("_processed.md", b"Content")
         
         result = pipeline._filter(note)
         assert result is False
     
-    def test_filter_unchanged_content(self, pipeline):
+    def test_filter_unchanged_content(self, pipeline, make_note):
         """Test filtering of unchanged content via hash."""
-        # Content as it would appear after frontmatter extraction (with leading newline)
-        content_after_extraction = "\nTest content without frontmatter"
-        existing_hash = calculate_file_hash(content_after_extraction)
-        
-        frontmatter_content = f"""---
-processed_datetime: "2025-01-01T12:00:00Z"
-note_hash: "{existing_hash}"
-summary: "Test"
-tags: ["#test"]
----
-
-Test content without frontmatter"""
-        
-        note = Note(
-            file_path="/path/note.md",
-            name="note.md",
-            content=frontmatter_content.encode('utf-8')
-        )
+        note = make_note(content=_NOTE_UNCHANGED)
         
         result = pipeline._filter(note)
         assert result is False  # Should filter out unchanged content
     
-    def test_filter_changed_content(self, pipeline):
+    def test_filter_changed_content(self, pipeline, make_note):
         """Test that changed content passes filter."""
         frontmatter_content = """---
 processed_datetime: "2025-01-01T12:00:00Z"
@@ -115,152 +154,96 @@ tags: ["#test"]
 
 New content that has changed"""
         
-        note = Note(
-            file_path="/path/note.md",
-            name="note.md",
-            content=frontmatter_content.encode('utf-8')
-        )
+        note = make_note(content=frontmatter_content.encode('utf-8'))
         
         result = pipeline._filter(note)
         assert result is True  # Should pass filter due to hash mismatch
     
-    def test_filter_new_note(self, pipeline):
+    def test_filter_new_note(self, pipeline, make_note):
         """Test that new notes without frontmatter pass filter."""
-        note = Note(
-            file_path="/path/note.md",
-            name="note.md",
-            content=b"# New Note\n\nThis is new content"
-        )
+        note = make_note(content=b"# New Note\n\nThis is new content")
         
         result = pipeline._filter(note)
         assert result is True
         assert note.text_content == "# New Note\n\nThis is new content"
         assert note.content_without_frontmatter == "# New Note\n\nThis is new content"
     
-    def test_filter_unicode_decode_error(self, pipeline):
+    def test_filter_unicode_decode_error(self, pipeline, make_note):
         """Test handling of non-UTF8 content."""
-        note = Note(
-            file_path="/path/binary.bin",
-            name="binary.bin",
-            content=b'\xff\xfe\x00\x00'  # Invalid UTF-8
-        )
+        note = make_note("binary.bin", b'\xff\xfe\x00\x00')  # Invalid UTF-8
         
         result = pipeline._filter(note)
         assert result is False
     
-    def test_filter_skips_ignore_parse_true(self, pipeline, sample_note):
-        """Test that notes with ignoreParse: true are filtered out."""
-        content = """---
-ignoreParse: true
----
-
-This note should be ignored."""
-        note = sample_note("ignore_me.md", content)
+    @pytest.mark.parametrize("content, expected", [
+        pytest.param("---\nignoreParse: true\n---\n\nThis note should be ignored.", False, id="true"),
+        pytest.param("---\nignoreParse: 'true'\n---\n\nThis note should be ignored.", False, id="string_true"),
+        pytest.param("---\nignoreParse: 'True'\n---\n\nThis note should be ignored.", False, id="case_insensitive"),
+        pytest.param("---\nignoreParse: false\n---\n\nThis note should be processed.", True, id="false"),
+        pytest.param('---\nother_property: "value"\n---\n\nThis note should be processed.', True, id="missing"),
+        pytest.param('---\nignoreParse: "not_true"\n---\n\nThis note should be processed.', True, id="other_value"),
+        pytest.param("This note has no frontmatter and should be processed.", True, id="no_frontmatter"),
+    ])
+    def test_filter_ignore_parse(self, pipeline, sample_note, content, expected):
+        """Test that only a true (bool or any-case string) ignoreParse filters a note out."""
+        note = sample_note("ignore_parse.md", content)
         
         result = pipeline._filter(note)
-        assert result is False
+        assert result is expected
     
-    def test_filter_skips_ignore_parse_string_true(self, pipeline, sample_note):
-        """Test that notes with ignoreParse: 'true' (string) are filtered out."""
-        content = """---
-ignoreParse: 'true'
----
-
-This note should also be ignored."""
-        note = sample_note("ignore_string.md", content)
+    def test_filter_parses_frontmatter_once(self, pipeline, sample_note):
+        """Test that filtering the same note again reuses the parsed frontmatter."""
+        note = sample_note("note.md", "---\nsummary: Test\n---\n\nBody")
         
-        result = pipeline._filter(note)
-        assert result is False
-    
-    def test_filter_skips_ignore_parse_case_insensitive(self, pipeline, sample_note):
-        """Test that ignoreParse: 'True' (mixed case) is filtered out."""
-        content = """---
-ignoreParse: 'True'
----
-
-This note should be ignored too."""
-        note = sample_note("ignore_case.md", content)
+        with patch('pipeline.parse_frontmatter', wraps=parse_frontmatter) as mock_parse:
+            assert pipeline._filter(note) is True
+            assert pipeline._filter(note) is True
         
-        result = pipeline._filter(note)
-        assert result is False
+        mock_parse.assert_called_once()
+        assert note.existing_frontmatter == {"summary": "Test"}
+        assert note.content_without_frontmatter == "\nBody"
     
-    def test_filter_allows_ignore_parse_false(self, pipeline, sample_note):
-        """Test that notes with ignoreParse: false are processed."""
-        content = """---
-ignoreParse: false
----
-
-This note should be processed."""
-        note = sample_note("process_me.md", content)
+    def test_filter_unchanged_hash_skips_yaml_parse(self, pipeline, make_note):
+        """Test that an unchanged note is filtered on its note_hash alone."""
+        note = make_note(content=_NOTE_UNCHANGED)
         
-        result = pipeline._filter(note)
-        assert result is True
-    
-    def test_filter_allows_ignore_parse_missing(self, pipeline, sample_note):
-        """Test that notes without ignoreParse property are processed."""
-        content = """---
-other_property: "value"
----
-
-This note should be processed."""
-        note = sample_note("normal_note.md", content)
+        with patch('pipeline.parse_frontmatter') as mock_parse:
+            assert pipeline._filter(note) is False
         
-        result = pipeline._filter(note)
-        assert result is True
+        mock_parse.assert_not_called()
     
-    def test_filter_allows_ignore_parse_other_values(self, pipeline, sample_note):
-        """Test that notes with ignoreParse set to other values are processed."""
-        content = """---
-ignoreParse: "not_true"
----
-
-This note should be processed."""
-        note = sample_note("other_value.md", content)
+    @pytest.mark.parametrize("frontmatter", [
+        pytest.param("tags: [unclosed", id="unclosed_flow_list"),
+        pytest.param("summary: a: b", id="nested_colon"),
+        pytest.param("- a list", id="list_block"),
+    ])
+    def test_filter_invalid_frontmatter_with_matching_hash(self, pipeline, make_note, frontmatter):
+        """Test that frontmatter YAML can't load is reprocessed even when note_hash matches."""
+        content = f"---\nnote_hash: {_HASH_UNCHANGED}\n{frontmatter}\n---\n\nTest content without frontmatter"
+        note = make_note(content=content.encode('utf-8'))
         
-        result = pipeline._filter(note)
-        assert result is True
-    
-    def test_filter_ignore_parse_without_frontmatter(self, pipeline, sample_note):
-        """Test that notes without frontmatter are processed normally."""
-        content = "This note has no frontmatter and should be processed."
-        note = sample_note("no_frontmatter.md", content)
+        with patch('pipeline.parse_frontmatter', wraps=parse_frontmatter) as mock_parse:
+            assert pipeline._filter(note) is True
         
-        result = pipeline._filter(note)
-        assert result is True
+        mock_parse.assert_called_once()
     
-    def test_validate_file_size_within_limit(self, pipeline, mock_config):
-        """Test validation passes for files within size limit."""
-        mock_config.max_note_size_kb = 10
+    @pytest.mark.parametrize("limit_kb, content, expected", [
+        pytest.param(10, b"Small content", True, id="within_limit"),
+        pytest.param(1, _PAYLOAD_2KB, False, id="exceeds_limit"),
+        pytest.param(0.001, _PAYLOAD_OVER_TINY, False, id="tiny_limit"),
+    ])
+    def test_validate_file_size(self, pipeline, mock_config, monkeypatch, make_note, limit_kb, content, expected):
+        """Test that validation passes only for files within the size limit."""
+        monkeypatch.setattr(mock_config, "max_note_size_kb", limit_kb)
         
-        note = Note(
-            file_path="/path/note.md",
-            name="note.md",
-            content=b"Small content"  # Much less than 10KB
-        )
+        note = make_note(content=content)
         
         result = pipeline._validate(note)
-        assert result is True
-    
-    def test_validate_file_size_exceeds_limit(self, pipeline, mock_config):
-        """Test validation fails for files exceeding size limit."""
-        mock_config.max_note_size_kb = 1  # 1KB limit
-        
-        note = Note(
-            file_path="/path/note.md",
-            name="note.md",
-            content=b"X" * 2000  # 2KB of content
-        )
-        
-        result = pipeline._validate(note)
-        assert result is False
+        assert result is expected
     
-    def test_mark_as_processing(self, pipeline, mock_file_client):
+    def test_mark_as_processing(self, pipeline, mock_file_client, make_note):
         """Test marking file as processing with underscore prefix."""
-        note = Note(
-            file_path="/path/note.md",
-            name="note.md",
-            content=b"Content"
-        )
+        note = make_note(content=b"Content")
         
         pipeline._mark_as_processing(note)
         
@@ -274,26 +257,12 @@ This note should be processed."""
         assert note.name == "_note.md"
         assert note.file_path == "/path/_note.md"
     
-    def test_enhance_with_llm_success(self, pipeline, mock_claude_client):
+    def test_enhance_with_llm_success(self, pipeline, mock_claude_client, make_note):
         """Test successful LLM enhancement."""
-        note = Note(
-            file_path="/path/note.md",
-            name="note.md",
-            content=b"Original content"
-        )
+        note = make_note(content=b"Original content")
         note.content_without_frontmatter = "Original content"
         
-        # Configure mock response (Claude client returns JSON string)
-        import json
-        mock_claude_client.send_message.return_value = json.dumps({
-            "content": "# Enhanced Content\n\nThis is better formatted.",
-            "metadata": {
-                "summary": "A test note",
-                "tags": ["#test", "#enhanced"],
-                "para_category": "resources"
-            }
-        })
-        
+        # Relies on the default JSON response of the mock_claude_client fixture
         result = pipeline._enhance_with_llm(note)
         
         assert result is True
@@ -302,13 +271,9 @@ This note should be processed."""
         assert note.metadata["tags"] == ["#test", "#enhanced"]
         assert note.metadata["para_category"] == "resources"
     
-    def test_enhance_with_llm_failure(self, pipeline, mock_claude_client):
+    def test_enhance_with_llm_failure(self, pipeline, mock_claude_client, make_note):
         """Test handling of LLM API failure."""
-        note = Note(
-            file_path="/path/note.md",
-            name="note.md",
-            content=b"Content"
-        )
+        note = make_note(content=b"Content")
         note.content_without_frontmatter = "Content"
         
         # Configure mock to raise exception
@@ -319,13 +284,9 @@ This note should be processed."""
         assert result is False
         assert note.enhanced_content == ""  # Should remain empty
     
-    def test_generate_metadata(self, pipeline):
+    def test_generate_metadata(self, pipeline, make_note):
         """Test metadata generation."""
-        note = Note(
-            file_path="/path/note.md",
-            name="note.md",
-            content=b"Content"
-        )
+        note = make_note(content=b"Content")
         note.enhanced_content = "Enhanced content for testing"
         note.metadata = {
             "summary": "Test summary",
@@ -346,13 +307,9 @@ This note should be processed."""
         assert note.metadata['summary'] == "Test summary"
         assert note.metadata['tags'] == ["#tag1", "#tag2"]
     
-    def test_generate_metadata_defaults(self, pipeline):
+    def test_generate_metadata_defaults(self, pipeline, make_note):
         """Test metadata generation with missing fields."""
-        note = Note(
-            file_path="/path/note.md",
-            name="note.md",
-            content=b"Content"
-        )
+        note = make_note(content=b"Content")
         note.enhanced_content = "Content"
         note.metadata = {}  # No metadata from Claude
         
@@ -362,13 +319,9 @@ This note should be processed."""
         assert note.metadata['summary'] == 'No summary generated'
         assert note.metadata['tags'] == []
     
-    def test_save_to_file_system(self, pipeline, mock_file_client):
+    def test_save_to_file_system(self, pipeline, mock_file_client, make_note):
         """Test saving processed note back to file system."""
-        note = Note(
-            file_path="/path/_note.md",
-            name="_note.md",
-            content=b"Original"
-        )
+        note = make_note("_note.md", b"Original")
         note.enhanced_content = "# Enhanced Note\n\nProcessed content"
         note.metadata = {
             'processed_datetime': 'Jan 07, 2025 12:00:00 UTC',
@@ -393,23 +346,12 @@ This note should be processed."""
         assert "processed_datetime: Jan 07, 2025 12:00:00 UTC" in saved_content
         assert "# Enhanced Note\n\nProcessed content" in saved_content
     
-    def test_process_note_full_success(self, pipeline, mock_file_client, mock_claude_client):
+    def test_process_note_full_success(self, pipeline, mock_file_client, mock_claude_client, make_note):
         """Test full successful note processing."""
-        note = Note(
-            file_path="/path/note.md",
-            name="note.md",
-            content=b"# Original Note\n\nOriginal content"
-        )
+        note = make_note(content=b"# Original Note\n\nOriginal content")
         
         # Configure mocks (Claude client returns JSON string)
-        import json
-        mock_claude_client.send_message.return_value = json.dumps({
-            "content": "# Enhanced Note\n\nEnhanced content",
-            "metadata": {
-                "summary": "An enhanced note",
-                "tags": ["#enhanced"]
-            }
-        })
+        mock_claude_client.send_message.return_value = _CLAUDE_FULL
         
         success, result = pipeline.process_note(note)
         
@@ -421,13 +363,9 @@ This note should be processed."""
         mock_claude_client.send_message.assert_called_once()  # enhance_with_claude
         mock_file_client.update_file.assert_called_once()  # save_to_file_system
     
-    def test_process_note_filter_failure(self, pipeline, mock_file_client):
-        """Test processing stops when filter fails."""
-        note = Note(
-            file_path="/path/_already_processed.md",
-            name="_already_processed.md",
-            content=b"Content"
-        )
+    def test_process_note_filter_failure(self, pipeline, mock_file_client, make_note):
+        """Test that an underscore-prefixed note is filtered without touching files."""
+        note = make_note("_already_processed.md", b"Content")
         
         success, result = pipeline.process_note(note)
         
@@ -438,15 +376,11 @@ This note should be processed."""
         mock_file_client.rename_file.assert_not_called()
         mock_file_client.update_file.assert_not_called()
     
-    def test_process_note_validation_failure(self, pipeline, mock_file_client, mock_config):
+    def test_process_note_validation_failure(self, pipeline, mock_file_client, mock_config, monkeypatch, make_note):
         """Test processing stops when validation fails."""
-        mock_config.max_note_size_kb = 0.001  # Very small limit
+        monkeypatch.setattr(mock_config, "max_note_size_kb", 0.001)  # Very small limit
         
-        note = Note(
-            file_path="/path/note.md",
-            name="note.md",
-            content=b"This content is too large for the configured limit"
-        )
+        note = make_note(content=_PAYLOAD_OVER_TINY)
         
         success, result = pipeline.process_note(note)
         
@@ -457,13 +391,9 @@ This note should be processed."""
         mock_file_client.rename_file.assert_not_called()
         mock_file_client.update_file.assert_not_called()
     
-    def test_process_note_exception_handling(self, pipeline, mock_file_client):
+    def test_process_note_exception_handling(self, pipeline, mock_file_client, make_note):
         """Test exception handling during processing."""
-        note = Note(
-            file_path="/path/note.md",
-            name="note.md",
-            content=b"Content"
-        )
+        note = make_note(content=b"Content")
         
         # Make rename_file raise exception
         mock_file_client.rename_file.side_effect = Exception("File system error")
@@ -473,13 +403,9 @@ This note should be processed."""
         assert success is False  # Should return False on exception
         assert result == ProcessingResult.ERROR
     
-    def test_process_note_llm_failure(self, pipeline, mock_file_client, mock_claude_client):
+    def test_process_note_llm_failure(self, pipeline, mock_file_client, mock_claude_client, make_note):
         """Test processing when LLM enhancement fails."""
-        note = Note(
-            file_path="/path/note.md",
-            name="note.md",
-            content=b"# Test Note\n\nContent"
-        )
+        note = make_note(content=b"# Test Note\n\nContent")
         
         # Configure mock to fail during LLM enhancement
         mock_claude_client.send_message.side_effect = Exception("API Error")
@@ -492,7 +418,7 @@ This note should be processed."""
         # Verify file was marked as processing
         mock_file_client.rename_file.assert_called_once()
     
-    def test_process_note_ignore_parse_returns_filtered(self, pipeline):
+    def test_process_note_ignore_parse_returns_filtered(self, pipeline, make_note):
         """Test that notes with ignoreParse return FILTERED result."""
         content = """---
 ignoreParse: true
@@ -500,69 +426,35 @@ ignoreParse: true
 
 This note should be ignored."""
         
-        note = Note(
-            file_path="/path/note.md",
-            name="note.md",
-            content=content.encode('utf-8')
-        )
+        note = make_note(content=content.encode('utf-8'))
         
         success, result = pipeline.process_note(note)
         
         assert success is False
         assert result == ProcessingResult.FILTERED
     
-    def test_process_note_unchanged_hash_returns_filtered(self, pipeline):
+    def test_process_note_unchanged_hash_returns_filtered(self, pipeline, make_note):
         """Test that unchanged notes return FILTERED result."""
-        # Content as it would appear after frontmatter extraction
-        content_after_extraction = "\nUnchanged content"
-        existing_hash = calculate_file_hash(content_after_extraction)
-        
-        frontmatter_content = f"""---
-processed_datetime: "2025-01-01T12:00:00Z"
-note_hash: "{existing_hash}"
-summary: "Test"
-tags: ["#test"]
----
-
-Unchanged content"""
-        
-        note = Note(
-            file_path="/path/note.md",
-            name="note.md",
-            content=frontmatter_content.encode('utf-8')
-        )
+        note = make_note(content=_NOTE_UNCHANGED_PROCESS)
         
         success, result = pipeline.process_note(note)
         
         assert success is False
         assert result == ProcessingResult.FILTERED
     
-    def test_original_content_preservation(self, pipeline, mock_file_client, mock_claude_client):
-        """Test that original content is preserved at the end of processed note."""
-        original_content = "# My Raw Note\n\nThis is my original unprocessed text with typos and bad formating."
-        
-        note = Note(
-            file_path="/path/note.md",
-            name="note.md",
-            content=original_content.encode('utf-8')
-        )
+    def test_original_content_preserved_and_hashed(self, pipeline, mock_file_client, mock_claude_client, make_note):
+        """Test that the original note is kept after the enhanced content and covered by the hash."""
+        note = make_note(content=_RAW_NOTE_BYTES)
         
         # Configure mock LLM response
-        import json
-        mock_claude_client.send_message.return_value = json.dumps({
-            "content": "# My Processed Note\n\nThis is the cleaned and formatted text.",
-            "metadata": {
-                "summary": "A cleaned note",
-                "tags": ["#cleaned"]
-            }
-        })
+        mock_claude_client.send_message.return_value = _CLAUDE_CLEANED
         
         success, result = pipeline.process_note(note)
         
         assert success is True
         assert result == ProcessingResult.SUCCESS
         
-        # Get the saved content
+        # Get the saved content once; every check below reads it
         call_args = mock_file_client.update_file.call_args
         saved_content = call_args[1]['content'].decode('utf-8')
         
@@ -570,53 +462,24 @@ Unchanged content"""
         assert "# My Processed Note" in saved_content
         assert "This is the cleaned and formatted text." in saved_content
         assert "---\n## Original Note\n---\n" in saved_content
-        assert original_content in saved_content
-        
-        # Verify the order: enhanced content comes before original
-        enhanced_pos = saved_content.index("# My Processed Note")
-        separator_pos = saved_content.index("---\n## Original Note\n---\n")
-        original_pos = saved_content.index(original_content)
-        
-        assert enhanced_pos < separator_pos < original_pos
-    
-    def test_hash_includes_original_content(self, pipeline, mock_file_client, mock_claude_client):
-        """Test that the note hash includes both enhanced and original content."""
-        original = "Original content here"
-        enhanced = "Enhanced content here"
-        
-        note = Note(
-            file_path="/path/note.md",
-            name="note.md",
-            content=original.encode('utf-8')
-        )
-        
-        # Configure mock
-        import json
-        mock_claude_client.send_message.return_value = json.dumps({
-            "content": enhanced,
-            "metadata": {"summary": "Test", "tags": []}
-        })
+        assert _RAW_NOTE in saved_content
         
-        success, result = pipeline.process_note(note)
-        assert success is True
+        # Verify the order: enhanced content comes before original; each
+        # search starts from the previous match
+        enhanced_pos = saved_content.find("# My Processed Note")
+        separator_pos = saved_content.find("---\n## Original Note\n---\n", enhanced_pos)
+        original_pos = saved_content.find(_RAW_NOTE, separator_pos)
         
-        # Get saved content and extract hash
-        call_args = mock_file_client.update_file.call_args
-        saved_content = call_args[1]['content'].decode('utf-8')
+        assert -1 < enhanced_pos < separator_pos < original_pos
         
         # Extract the hash from frontmatter
-        import re
-        hash_match = re.search(r'note_hash: ([^\n]+)', saved_content)
-        assert hash_match is not None
-        saved_hash = hash_match.group(1)
+        assert "note_hash: " in saved_content
+        saved_hash = saved_content.partition("note_hash: ")[2].partition("\n")[0]
         
-        # Calculate expected hash
-        combined_content = enhanced + "\n\n---\n## Original Note\n---\n\n" + original
-        expected_hash = calculate_file_hash(combined_content)
-        
-        assert saved_hash == expected_hash
+        # Hash covers enhanced content, separator and original content
+        assert saved_hash == _HASH_COMBINED
     
-    def test_original_content_with_existing_frontmatter(self, pipeline, mock_file_client, mock_claude_client):
+    def test_original_content_with_existing_frontmatter(self, pipeline, mock_file_client, mock_claude_client, make_note):
         """Test preservation when original note had frontmatter."""
         original_with_fm = """---
 old_field: value
@@ -624,18 +487,10 @@ old_field: value
 
 Original content with frontmatter"""
         
-        note = Note(
-            file_path="/path/note.md",
-            name="note.md",
-            content=original_with_fm.encode('utf-8')
-        )
+        note = make_note(content=original_with_fm.encode('utf-8'))
         
         # Configure mock
-        import json
-        mock_claude_client.send_message.return_value = json.dumps({
-            "content": "Enhanced version",
-            "metadata": {"summary": "Test", "tags": []}
-        })
+        mock_claude_client.send_message.return_value = _CLAUDE_MINIMAL
         
         success, result = pipeline.process_note(note)
         assert success is True
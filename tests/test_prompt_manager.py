@@ -1,68 +1,151 @@
 """Tests for the prompt manager module."""
 
 import pytest
-from unittest.mock import Mock, patch, mock_open
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
 import json
 import yaml
-from pathlib import Path
 
+import prompt_manager as prompt_manager_module
 from prompt_manager import PromptManager
 
+pytestmark = pytest.mark.xdist_group("prompts")
+
+# Dump mocked prompt files with libyaml too, matching the loader side
+_YAML_DUMPER = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+
+# Sample prompt configuration matching the actual prompts.yaml structure
+_SAMPLE_PROMPTS = {
+    "version": "1.0",
+    "prompts": {
+        "system": "You are an AI assistant helping to organize and enhance notes.\nYour task is to clean up raw notes, add relevant hashtags, and create summaries.\n\nAlways respond with a JSON object containing:\n- content: The enhanced note content\n- metadata: Object with summary, tags, and other frontmatter\n",
+        "user": "Please process this note. Leave as much of the original text as appropriate. You are to keep the voice of the author and only apply a light touch.:\n1. Clean up formatting and grammar.\n2. Add clear bullet points where appropriate.\n3. Anywhere you see the potential for future expansion, a clear citation, or to challenge the author with questions, make an inline note using (()) to denote your thoughts.\n4. If you see any text noted between (()), expand the thoughts or text outlined. These are notes from the user for you to contemplate.\n5. If you see any obvious literary references, names, published articles, or published media, do some research to find those references and create appropriate links, hashtags, or a reference section in the document.\n4. Generate 3-5 relevant hashtags.\n5. Create a one-line summary.\n6. Create a one-line takeaway describing why this note is important or how it links to other notes/thoughts.\n7. If the note has any tags (#) in the body, add those to the metadata returned. If the tags are embedded in text, leave them alone, otherwise if they're standalone remove them from the enhanced note.\n\nNote content:\n{note_content}\n\nRespond with JSON in this format:\n{{\n  \"content\": \"enhanced note content here\",\n  \"metadata\": {{\n    \"summary\": \"one line summary\",\n    \"takeaway\": \"one line takeaway\",\n    \"tags\": [\"#tag1\", \"#tag2\"]\n  }}\n}}"
+    }
+}
+
+# Prompt file contents as UTF-8 YAML bytes, dumped once at import
+_SAMPLE_YAML = yaml.dump(_SAMPLE_PROMPTS, Dumper=_YAML_DUMPER, encoding='utf-8')
+_CONFIG_YAML = yaml.dump({
+    "version": "1.0",
+    "prompts": {
+        "system": "Custom system prompt",
+        "user": "Custom user prompt: {note_content}"
+    }
+}, Dumper=_YAML_DUMPER, encoding='utf-8')
+_CUSTOM_YAML = yaml.dump({
+    "version": "1.0",
+    "prompts": {
+        "system": "You are Claude, an AI assistant specialized in {specialty}.",
+        "user": "Task: {task}\nContent: {note_content}\nInstructions: {instructions}"
+    }
+}, Dumper=_YAML_DUMPER, encoding='utf-8')
+
+
+@pytest.fixture(scope="module")
+def mock_config():
+    """Mock configuration shared by the module; no test modifies it."""
+    config = Mock()
+    config.processing_version = "1.0"
+    return config
+
+
+@pytest.fixture(scope="module")
+def sample_prompts():
+    """Sample prompt configuration matching the actual prompts.yaml structure."""
+    return _SAMPLE_PROMPTS
+
+
+@pytest.fixture(scope="session")
+def prompts_files(tmp_path_factory):
+    """Write each sample prompts file once per session; "missing" is never created."""
+    prompts_dir = tmp_path_factory.mktemp("prompts")
+    files = {
+        "sample": _SAMPLE_YAML,
+        "config": _CONFIG_YAML,
+        "custom": _CUSTOM_YAML,
+        "invalid": b"invalid: yaml: content:",
+    }
+    paths = {name: prompts_dir / f"{name}.yaml" for name in files}
+    for name, data in files.items():
+        paths[name].write_bytes(data)
+    paths["missing"] = prompts_dir / "missing.yaml"
+    return paths
+
+
+def _config_for(prompts_path):
+    """Build a minimal config that points the manager at prompts_path."""
+    return SimpleNamespace(processing_version="1.0", prompts_path=str(prompts_path))
+
+
+@pytest.fixture(scope="module")
+def prompt_manager(mock_config, sample_prompts):
+    """Create one PromptManager, without the YAML round trip, shared by the module."""
+    # File loading is covered by the test_initialization_* tests
+    return PromptManager.from_mapping(mock_config, sample_prompts)
+
 
 class TestPromptManager:
     """Test the PromptManager class."""
     
-    @pytest.fixture
-    def mock_config(self):
-        """Mock configuration for testing."""
-        config = Mock()
-        config.processing_version = "1.0"
-        return config
+    @pytest.fixture(autouse=True)
+    def _clear_prompt_cache(self):
+        """Drop cached prompts so each test reads its prompts file."""
+        PromptManager.clear_cache()
     
-    @pytest.fixture
-    def sample_prompts(self):
-        """Sample prompt configuration matching the actual prompts.yaml structure."""
-        return {
-            "version": "1.0",
-            "prompts": {
-                "system": "You are an AI assistant helping to organize and enhance notes.\nYour task is to clean up raw notes, add relevant hashtags, and create summaries.\n\nAlways respond with a JSON object containing:\n- content: The enhanced note content\n- metadata: Object with summary, tags, and other frontmatter\n",
-                "user": "Please process this note. Leave as much of the original text as appropriate. You are to keep the voice of the author and only apply a light touch.:\n1. Clean up formatting and grammar.\n2. Add clear bullet points where appropriate.\n3. Anywhere you see the potential for future expansion, a clear citation, or to challenge the author with questions, make an inline note using (()) to denote your thoughts.\n4. If you see any text noted between (()), expand the thoughts or text outlined. These are notes from the user for you to contemplate.\n5. If you see any obvious literary references, names, published articles, or published media, do some research to find those references and create appropriate links, hashtags, or a reference section in the document.\n4. Generate 3-5 relevant hashtags.\n5. Create a one-line summary.\n6. Create a one-line takeaway describing why this note is important or how it links to other notes/thoughts.\n7. If the note has any tags (#) in the body, add those to the metadata returned. If the tags are embedded in text, leave them alone, otherwise if they're standalone remove them from the enhanced note.\n\nNote content:\n{note_content}\n\nRespond with JSON in this format:\n{{\n  \"content\": \"enhanced note content here\",\n  \"metadata\": {{\n    \"summary\": \"one line summary\",\n    \"takeaway\": \"one line takeaway\",\n    \"tags\": [\"#tag1\", \"#tag2\"]\n  }}\n}}"
-            }
-        }
+    def test_initialization_loads_prompts(self, prompts_files, sample_prompts):
+        """Test that prompts are loaded during initialization."""
+        manager = PromptManager(_config_for(prompts_files["sample"]))
+        
+        assert manager.prompts == sample_prompts["prompts"]
     
-    @pytest.fixture
-    def prompt_manager(self, mock_config, sample_prompts):
-        """Create a PromptManager instance."""
-        with patch('prompt_manager.Path.exists', return_value=True):
-            with patch('builtins.open', mock_open(read_data=yaml.dump(sample_prompts))):
-                return PromptManager(mock_config)
+    def test_initialization_reuses_cached_prompts(self, prompts_files):
+        """Test that a second manager reuses the parsed file instead of reparsing it."""
+        config = _config_for(prompts_files["sample"])
+        
+        with patch('prompt_manager.yaml.load', wraps=yaml.load) as mock_load:
+            first = PromptManager(config)
+            second = PromptManager(config)
+        
+        mock_load.assert_called_once()
+        assert second.prompts == first.prompts
+        assert second.prompts is not first.prompts
     
-    def test_initialization_loads_prompts(self, mock_config, sample_prompts):
-        """Test that prompts are loaded during initialization."""
-        with patch('prompt_manager.Path.exists', return_value=True):
-            with patch('builtins.open', mock_open(read_data=yaml.dump(sample_prompts))):
-                manager = PromptManager(mock_config)
+    def test_edited_file_replaces_cache_entry(self, tmp_path):
+        """Test that editing the prompts file reloads it without growing the cache."""
+        prompts_path = tmp_path / "prompts.yaml"
+        prompts_path.write_bytes(_CONFIG_YAML)
+        config = _config_for(prompts_path)
+        PromptManager(config)
+        
+        prompts_path.write_bytes(_CUSTOM_YAML)
+        manager = PromptManager(config)
+        
+        assert manager.prompts["system"] == "You are Claude, an AI assistant specialized in {specialty}."
+        assert len(prompt_manager_module._PROMPT_CACHE) == 1
+    
+    def test_from_mapping(self, mock_config, sample_prompts):
+        """Test building a manager from an already-parsed mapping."""
+        with patch('builtins.open') as mocked:
+            manager = PromptManager.from_mapping(mock_config, sample_prompts)
         
+        mocked.assert_not_called()
+        assert manager.config is mock_config
         assert manager.prompts == sample_prompts["prompts"]
     
-    def test_initialization_missing_prompt_file(self, mock_config):
+    def test_initialization_missing_prompt_file(self, prompts_files):
         """Test initialization when prompt file is missing uses defaults."""
-        with patch('prompt_manager.Path.exists', return_value=False):
-            manager = PromptManager(mock_config)
+        manager = PromptManager(_config_for(prompts_files["missing"]))
             
         # Should have default prompts
         assert 'system' in manager.prompts
         assert 'user' in manager.prompts
         assert 'AI assistant' in manager.prompts['system']
+        assert type(manager.prompts) is dict
     
-    def test_load_prompts_invalid_yaml(self, mock_config):
+    def test_load_prompts_invalid_yaml(self, prompts_files):
         """Test loading invalid YAML."""
-        invalid_yaml = "invalid: yaml: content:"
-        
-        with patch('prompt_manager.Path.exists', return_value=True):
-            with patch('builtins.open', mock_open(read_data=invalid_yaml)):
-                with pytest.raises(yaml.YAMLError):
-                    PromptManager(mock_config)
+        with pytest.raises(yaml.YAMLError):
+            PromptManager(_config_for(prompts_files["invalid"]))
     
     def test_format_note_prompt(self, prompt_manager):
         """Test formatting a note prompt."""
@@ -95,6 +178,26 @@ class TestPromptManager:
         assert "user" in formatted
         assert "Note content:" in formatted["user"]
     
+    @pytest.mark.parametrize("template, expected", [
+        pytest.param("Note:\n{note_content}\nReply as {{}}", "Note:\nBody {x}\nReply as {}", id="escaped_braces"),
+        pytest.param("No placeholder here", "No placeholder here", id="no_field"),
+        pytest.param("{note_content} and {note_content}", "Body {x} and Body {x}", id="repeated_field"),
+    ])
+    def test_format_note_prompt_templates(self, mock_config, template, expected):
+        """Test that user templates render exactly like str.format."""
+        manager = PromptManager.from_mapping(mock_config, {"prompts": {"system": "System", "user": template}})
+        
+        assert manager.format_note_prompt("Body {x}")["user"] == expected
+    
+    def test_format_note_prompt_other_fields(self, mock_config):
+        """Test that templates with fields besides note_content still fail like str.format."""
+        manager = PromptManager.from_mapping(
+            mock_config, {"prompts": {"system": "System", "user": "Task: {task}\n{note_content}"}}
+        )
+        
+        with pytest.raises(KeyError):
+            manager.format_note_prompt("Body")
+    
     def test_parse_claude_response_valid_json(self, prompt_manager):
         """Test parsing valid JSON response from Claude."""
         response = json.dumps({
@@ -124,6 +227,18 @@ class TestPromptManager:
         assert result['metadata']['summary'] == 'Failed to parse AI response'
         assert result['metadata']['tags'] == ['#processing-error']
     
+    @pytest.mark.parametrize("response", [
+        pytest.param("", id="empty"),
+        pytest.param('["content", "metadata"]', id="array"),
+        pytest.param('```json\n"just a string"\n```', id="fenced_string"),
+    ])
+    def test_parse_claude_response_not_an_object(self, prompt_manager, response):
+        """Test that responses that are not JSON objects return fallback."""
+        result = prompt_manager.parse_claude_response(response)
+        
+        assert result['content'] == response
+        assert result['metadata']['tags'] == ['#processing-error']
+    
     def test_parse_claude_response_missing_content(self, prompt_manager):
         """Test parsing response missing required content field returns fallback."""
         response = json.dumps({
@@ -190,36 +305,16 @@ class TestPromptManager:
         
         assert result["metadata"]["nested"]["level2"]["level3"] == "value"
     
-    def test_prompt_loading_from_config(self, mock_config):
+    def test_prompt_loading_from_config(self, prompts_files):
         """Test that prompts are loaded correctly from config."""
-        test_prompts = {
-            "version": "1.0",
-            "prompts": {
-                "system": "Custom system prompt",
-                "user": "Custom user prompt: {note_content}"
-            }
-        }
-        
-        with patch('prompt_manager.Path.exists', return_value=True):
-            with patch('builtins.open', mock_open(read_data=yaml.dump(test_prompts))):
-                manager = PromptManager(mock_config)
+        manager = PromptManager(_config_for(prompts_files["config"]))
         
         assert manager.prompts["system"] == "Custom system prompt"
         assert manager.prompts["user"] == "Custom user prompt: {note_content}"
     
-    def test_custom_prompt_template(self, mock_config):
+    def test_custom_prompt_template(self, prompts_files):
         """Test using custom prompt templates."""
-        custom_prompts = {
-            "version": "1.0",
-            "prompts": {
-                "system": "You are Claude, an AI assistant specialized in {specialty}.",
-                "user": "Task: {task}\nContent: {note_content}\nInstructions: {instructions}"
-            }
-        }
-        
-        with patch('prompt_manager.Path.exists', return_value=True):
-            with patch('builtins.open', mock_open(read_data=yaml.dump(custom_prompts))):
-                manager = PromptManager(mock_config)
+        manager = PromptManager(_config_for(prompts_files["custom"]))
         
         # Test that templates are stored correctly
         assert "{specialty}" in manager.prompts["system"]
@@ -1,6 +1,29 @@
 """Tests for utils module."""
 
-from utils import calculate_file_hash, parse_frontmatter, generate_frontmatter
+import hashlib
+import os
+import time
+import tracemalloc
+
+import pytest
+import yaml
+from unittest.mock import Mock, patch
+
+from utils import (
+    EMPTY_FRONTMATTER,
+    EMPTY_FRONTMATTER_BYTES,
+    FRONTMATTER_MAX_LENGTH,
+    HASH_READ_CHUNK_SIZE,
+    calculate_file_hash,
+    calculate_file_hash_path,
+    calculate_file_hashes,
+    parse_frontmatter,
+    scan_frontmatter_scalars,
+    is_simple_frontmatter,
+    split_frontmatter,
+    generate_frontmatter,
+    generate_frontmatter_bytes
+)
 
 # Test constants
 SHA256_HASH_STRING_LENGTH = 71  # "sha256:" (7) + 64 hex chars
@@ -22,6 +45,17 @@ class TestCalculateFileHash:
         expected_hash = "sha256:315f5bdb76d078c43b8ac0064e4a0164612b1fce77c869345bfc94c75894edd3"
         assert result == expected_hash
     
+    def test_bytes_input(self):
+        """Test that UTF-8 bytes hash the same as the text they encode."""
+        result = calculate_file_hash(b"Hello, world!")
+        expected_hash = "sha256:315f5bdb76d078c43b8ac0064e4a0164612b1fce77c869345bfc94c75894edd3"
+        assert result == expected_hash
+    
+    def test_memoryview_input(self):
+        """Test hashing a large buffer through a memoryview without copying it."""
+        data = b"0123456789abcdef" * (1 << 16)
+        assert calculate_file_hash(memoryview(data)) == calculate_file_hash(data.decode('utf-8'))
+    
     def test_unicode_content(self):
         """Test hashing unicode content."""
         content = "Hello, 世界! 🌍"
@@ -59,6 +93,69 @@ Final paragraph here."""
         assert len(result) == SHA256_HASH_STRING_LENGTH
 
 
+class TestCalculateFileHashes:
+    """Test the calculate_file_hashes function."""
+    
+    def test_batch_matches_serial(self):
+        """Test that batch hashing returns the serial results in input order."""
+        items = [os.urandom(32 * 1024) for _ in range(1000)] + ["text note", ""]
+        
+        assert calculate_file_hashes(items) == [calculate_file_hash(item) for item in items]
+    
+    def test_empty_batch(self):
+        """Test that an empty batch returns an empty list."""
+        assert calculate_file_hashes([]) == []
+    
+    @pytest.mark.skipif(not os.environ.get("RUN_PERF"), reason="perf: set RUN_PERF=1 to run")
+    @pytest.mark.skipif((os.cpu_count() or 1) < 2, reason="needs more than one core")
+    def test_batch_scales(self):
+        """Guard batch hashing against losing its speedup over serial hashing."""
+        items = [os.urandom(1024 * 1024) for _ in range(200)]
+        
+        start = time.perf_counter()
+        for item in items:
+            hashlib.sha256(item).hexdigest()
+        serial = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        calculate_file_hashes(items)
+        batched = time.perf_counter() - start
+        
+        assert batched < serial * 0.75
+
+
+class TestCalculateFileHashPath:
+    """Test the calculate_file_hash_path function."""
+    
+    @pytest.mark.parametrize("size", [
+        0, 1, HASH_READ_CHUNK_SIZE - 1, HASH_READ_CHUNK_SIZE, HASH_READ_CHUNK_SIZE + 1
+    ])
+    def test_matches_in_memory_hash(self, tmp_path, size):
+        """Test that streaming a file gives the same hash as hashing its bytes."""
+        data = os.urandom(size)
+        file_path = tmp_path / "note.md"
+        file_path.write_bytes(data)
+        
+        assert calculate_file_hash_path(str(file_path)) == f"sha256:{hashlib.sha256(data).hexdigest()}"
+    
+    def test_large_file_constant_memory(self, tmp_path):
+        """Test that a large file is hashed without buffering it whole."""
+        data = os.urandom(10 * 1024 * 1024)
+        file_path = tmp_path / "large.md"
+        file_path.write_bytes(data)
+        expected = f"sha256:{hashlib.sha256(data).hexdigest()}"
+        
+        tracemalloc.start()
+        try:
+            result = calculate_file_hash_path(str(file_path))
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        
+        assert result == expected
+        assert peak < 256 * 1024
+
+
 class TestParseFrontmatter:
     """Test the parse_frontmatter function."""
     
@@ -125,6 +222,46 @@ This content never closes the frontmatter properly."""
         assert content_without_fm == content
         assert frontmatter == {}
     
+    def test_closing_delimiter_beyond_search_window(self):
+        """Test that a closing --- past the size cap is not treated as frontmatter."""
+        content = "---\n" + "x" * (FRONTMATTER_MAX_LENGTH + 1) + "\n---\nBody"
+        
+        content_without_fm, frontmatter = parse_frontmatter(content)
+        
+        assert content_without_fm == content
+        assert frontmatter == {}
+    
+    @pytest.mark.parametrize("content", [
+        "Regular content without frontmatter.",
+        "---\ntitle: Test Note\ntags: [\"#test\"]\n---\nBody",
+        "---\nsummary: Unicode 测试 🎉\n---\nContent with émojis ∑∏",
+        "---\n\n---\nContent after empty frontmatter.",
+        "---\ninvalid: yaml: content: here\n---\nBody",
+        "---\n- a list\n---\nBody",
+    ])
+    def test_bytes_input_matches_text(self, content):
+        """Test that UTF-8 bytes parse to the same result as the decoded text."""
+        content_without_fm, frontmatter = parse_frontmatter(content.encode('utf-8'))
+        
+        assert isinstance(content_without_fm, bytes)
+        assert (content_without_fm.decode('utf-8'), frontmatter) == parse_frontmatter(content)
+    
+    def test_bytes_invalid_utf8(self):
+        """Test that frontmatter bytes that aren't UTF-8 are left in the content."""
+        content = b"---\ntitle: \xff\xfe\n---\nBody"
+        
+        assert parse_frontmatter(content) == (content, {})
+    
+    def test_frontmatter_at_size_cap(self):
+        """Test that frontmatter exactly at the size cap is still parsed."""
+        value = "x" * (FRONTMATTER_MAX_LENGTH - len("key: "))
+        content = f"---\nkey: {value}\n---\nBody"
+        
+        content_without_fm, frontmatter = parse_frontmatter(content)
+        
+        assert content_without_fm == "Body"
+        assert frontmatter == {"key": value}
+    
     def test_frontmatter_with_complex_data(self):
         """Test frontmatter with complex nested data structures."""
         content = """---
@@ -149,6 +286,21 @@ Today we discussed the project timeline and deliverables."""
         assert frontmatter["tags"] == ["#meeting", "#project-alpha", "#deadlines"]
         assert frontmatter["note_hash"] == "sha256:abc123def456"
     
+    def test_minimal_frontmatter(self):
+        """Test the shortest possible frontmatter block."""
+        content_without_fm, frontmatter = parse_frontmatter("---\n\n---\n")
+        
+        assert content_without_fm == ""
+        assert frontmatter == {}
+    
+    def test_content_shorter_than_delimiters(self):
+        """Test content too short to contain both delimiters."""
+        content = "---\n---\n"
+        content_without_fm, frontmatter = parse_frontmatter(content)
+        
+        assert content_without_fm == content
+        assert frontmatter == {}
+    
     def test_content_starting_with_dashes_but_not_frontmatter(self):
         """Test content that starts with --- but isn't frontmatter."""
         content = """--- This is just a line starting with dashes
@@ -159,6 +311,91 @@ Just regular content."""
         
         assert content_without_fm == content
         assert frontmatter == {}
+    
+    @pytest.mark.parametrize("block", ["- first\n- second", "Just a heading between rules"])
+    def test_non_mapping_frontmatter(self, block):
+        """Test that a --- block that isn't a YAML mapping is left in the content."""
+        content = f"---\n{block}\n---\nBody"
+        
+        content_without_fm, frontmatter = parse_frontmatter(content)
+        
+        assert content_without_fm == content
+        assert frontmatter == {}
+    
+    @pytest.mark.skipif(not os.environ.get("RUN_PERF"), reason="perf: set RUN_PERF=1 to run")
+    def test_fast_reject_no_frontmatter_performance(self):
+        """Guard the no-frontmatter path against scanning or parsing the note."""
+        content = "# Plain note\n\n" + "x" * 1024
+        iterations = 100_000
+        
+        start = time.perf_counter_ns()
+        for _ in range(iterations):
+            parse_frontmatter(content)
+        mean_ns = (time.perf_counter_ns() - start) / iterations
+        
+        assert mean_ns < 2000
+    
+    @pytest.mark.skipif(not yaml.__with_libyaml__, reason="PyYAML built without libyaml")
+    def test_uses_libyaml_loader(self):
+        """Test that frontmatter is parsed with the C loader when it is available."""
+        with patch('yaml.load', wraps=yaml.load) as mock_load:
+            _, frontmatter = parse_frontmatter("---\ntitle: Test\n---\nBody")
+        
+        assert frontmatter == {"title": "Test"}
+        assert mock_load.call_args.kwargs['Loader'] is yaml.CSafeLoader
+
+
+class TestScanFrontmatterScalars:
+    """Test the YAML-free note_hash / ignoreParse scan."""
+    
+    def test_split_matches_parse(self):
+        """Test that split_frontmatter separates the same body parse_frontmatter does."""
+        content = "---\nnote_hash: sha256:abc\n---\n\nBody text"
+        frontmatter_text, body = split_frontmatter(content)
+        
+        assert frontmatter_text == "note_hash: sha256:abc"
+        assert body == parse_frontmatter(content)[0]
+    
+    def test_split_without_frontmatter(self):
+        """Test that content without a frontmatter block is returned unchanged."""
+        assert split_frontmatter("Just content") == (None, "Just content")
+    
+    def test_unquoted_and_quoted_values(self):
+        """Test raw values are returned with one pair of surrounding quotes removed."""
+        scalars = scan_frontmatter_scalars(
+            'note_hash: "sha256:abc"\nignoreParse: true  \nsummary: Test'
+        )
+        
+        assert scalars == {"note_hash": "sha256:abc", "ignoreParse": "true"}
+    
+    @pytest.mark.parametrize("frontmatter_text, expected", [
+        pytest.param(generate_frontmatter({
+            "processed_datetime": "Jan 07, 2025 14:30:25 UTC",
+            "note_hash": "sha256:" + "a" * 64,
+            "summary": "Sync: roadmap & 'ideas' 世界",
+            "tags": ["#meeting"],
+            "confidence": 0.9
+        })[4:-5], True, id="pipeline_output"),
+        pytest.param('note_hash: "sha256:abc"\ntags: []', True, id="quoted_and_empty_list"),
+        pytest.param("note_hash: sha256:abc\ntags: [unclosed", False, id="unclosed_flow_list"),
+        pytest.param("note_hash: sha256:abc\nsummary: a: b", False, id="nested_colon"),
+        pytest.param("- note_hash", False, id="list_block"),
+        pytest.param("note_hash: sha256:abc\ncreated: 2025-13-45", False, id="date_like"),
+        pytest.param("meta:\n  note_hash: nested", False, id="nested_mapping"),
+    ])
+    def test_simple_frontmatter(self, frontmatter_text, expected):
+        """Test that only blocks that always load as a mapping count as simple."""
+        assert is_simple_frontmatter(frontmatter_text) is expected
+        if expected:
+            assert isinstance(yaml.safe_load(frontmatter_text), dict)
+    
+    def test_nested_keys_ignored(self):
+        """Test that only top-level keys are picked up, the last one winning."""
+        scalars = scan_frontmatter_scalars(
+            "meta:\n  note_hash: nested\nnote_hash: first\nnote_hash: last"
+        )
+        
+        assert scalars == {"note_hash": "last"}
 
 
 class TestGenerateFrontmatter:
@@ -173,6 +410,12 @@ class TestGenerateFrontmatter:
         assert result.endswith("---\n")
         assert result == "---\n{}\n---\n"
     
+    def test_empty_metadata_skips_yaml(self):
+        """Test that empty metadata returns the constant without calling PyYAML."""
+        with patch.object(yaml, "dump", side_effect=RuntimeError("yaml.dump called")):
+            assert generate_frontmatter({}) is EMPTY_FRONTMATTER
+            assert generate_frontmatter_bytes({}) is EMPTY_FRONTMATTER_BYTES
+    
     def test_simple_metadata(self):
         """Test generating frontmatter from simple metadata."""
         metadata = {
@@ -261,6 +504,86 @@ class TestGenerateFrontmatter:
         assert "para_suggestion: projects" in result
         assert "confidence_score: 0.9" in result
     
+    def test_nested_metadata(self):
+        """Test that nested mapping values are emitted."""
+        result = generate_frontmatter({"nested": {"level2": "value"}})
+        
+        assert "nested:" in result
+        assert "level2: value" in result
+    
+    def test_ascii_metadata_matches_unicode_emitter(self):
+        """Test that the ASCII fast path emits the same YAML as the unicode path."""
+        metadata = {
+            "summary": "Plain ASCII summary",
+            "tags": ["#ascii", "#test"],
+            "nested": {"key": "value"},
+            "count": 3
+        }
+        
+        expected = yaml.dump(metadata, default_flow_style=False, allow_unicode=True, sort_keys=False)
+        
+        assert generate_frontmatter(metadata) == f"---\n{expected}---\n"
+    
+    @pytest.mark.parametrize("metadata", [
+        pytest.param({
+            "processed_datetime": "Jan 07, 2025 14:30:00 UTC",
+            "note_hash": "sha256:" + "0" * 64,
+            "summary": "Known fields around free text",
+            "tags": ["#meeting", "#project-alpha", "#a/b_c"]
+        }, id="system_fields"),
+        pytest.param({"tags": [], "summary": "Empty tags"}, id="empty_tags"),
+        pytest.param({"tags": ["#ok", "#needs quoting", "plain"]}, id="irregular_tags"),
+        pytest.param({"tags": ["#a'\n- '#b", "#c"]}, id="separator_inside_tag"),
+        pytest.param({"tags": ["#ok", 1]}, id="non_string_tag"),
+        pytest.param({"summary": "Plan, review and ship (v2)", "count": 42, "score": 0.9,
+                      "done": False, "owner": None}, id="plain_scalars"),
+        pytest.param({"summary": "yes", "note": "has: colon", "yes": 1, "trailing": "space "}, id="scalars_needing_quotes"),
+        pytest.param({"big": 1e17, "inf": float("inf"), "flag": True, "count": 2 ** 70}, id="numeric_edge_cases"),
+        pytest.param({"summary": "word " * 20}, id="long_summary_folds"),
+        pytest.param({"processed_datetime": "yesterday", "note_hash": "sha256:abc123"}, id="irregular_system_fields"),
+        pytest.param({"tags": ["#first"], "nested": {"key": ["a", {"b": None}]}, "count": 2}, id="interleaved_nested"),
+    ])
+    def test_known_fields_match_pyyaml(self, metadata):
+        """Test that directly emitted fields match PyYAML's output exactly."""
+        expected = yaml.dump(metadata, default_flow_style=False, allow_unicode=True, sort_keys=False)
+        
+        assert generate_frontmatter(metadata) == f"---\n{expected}---\n"
+    
+    def test_known_fields_skip_pyyaml(self, monkeypatch):
+        """Test that metadata made only of known fields never calls PyYAML."""
+        def fail_dump(*args, **kwargs):
+            raise AssertionError("yaml.dump should not be called")
+        monkeypatch.setattr(yaml, "dump", fail_dump)
+        
+        result = generate_frontmatter({
+            "processed_datetime": "Feb 02, 2025 09:15:00 UTC",
+            "note_hash": "sha256:" + "f" * 64,
+            "tags": ["#direct"]
+        })
+        
+        assert result == (
+            "---\nprocessed_datetime: Feb 02, 2025 09:15:00 UTC\n"
+            f"note_hash: sha256:{'f' * 64}\ntags:\n- '#direct'\n---\n"
+        )
+    
+    def test_plain_scalars_skip_pyyaml(self, monkeypatch):
+        """Test that typical LLM metadata of plain scalars never calls PyYAML."""
+        monkeypatch.setattr(yaml, "dump", Mock(side_effect=AssertionError("yaml.dump should not be called")))
+        
+        result = generate_frontmatter({
+            "summary": "Weekly sync on the roadmap",
+            "tags": ["#meeting"],
+            "para_category": "projects",
+            "confidence": 0.9,
+            "word_count": 42,
+            "archived": False
+        })
+        
+        assert result == (
+            "---\nsummary: Weekly sync on the roadmap\ntags:\n- '#meeting'\n"
+            "para_category: projects\nconfidence: 0.9\nword_count: 42\narchived: false\n---\n"
+        )
+    
     def test_unicode_in_metadata(self):
         """Test handling unicode characters in metadata."""
         metadata = {
@@ -274,6 +597,30 @@ class TestGenerateFrontmatter:
         assert "#世界" in result
 
 
+class TestGenerateFrontmatterBytes:
+    """Test the generate_frontmatter_bytes function."""
+    
+    def test_matches_encoded_string_output(self):
+        """Test that bytes output equals the encoded str output."""
+        metadata = {
+            "processed_datetime": "Jan 07, 2025 14:30:00 UTC",
+            "summary": "Notes with unicode: 世界 🌍",
+            "tags": ["#unicode", "#世界"]
+        }
+        
+        result = generate_frontmatter_bytes(metadata)
+        
+        assert isinstance(result, bytes)
+        assert result == generate_frontmatter(metadata).encode('utf-8')
+    
+    def test_delimiters(self):
+        """Test that bytes output is wrapped in --- delimiters."""
+        result = generate_frontmatter_bytes({"summary": "Test"})
+        
+        assert result.startswith(b"---\n")
+        assert result.endswith(b"---\n")
+
+
 class TestIntegration:
     """Integration tests combining multiple utils functions."""
     